@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+AUDIO_CACHE_DIR = "audio_cache"
+DISK_LIMIT_BYTES = 200 * 1024 * 1024
+MEMORY_ITEMS = 256
+OFFLINE_RETRY = 60  # Après un échec de synthèse (réseau coupé), gTTS n'est plus sollicité pendant 60 s
+
+def cache_key(text, lang, tld):
+    # Adressage par contenu : le même mot dans la même voix n'est synthétisé qu'une fois
+    return hashlib.sha256(f"{lang}|{tld}|{text}".encode("utf-8")).hexdigest()
+
+# --- CACHE AUDIO À DEUX NIVEAUX (MÉMOIRE + DISQUE) ---
+# synthesize(text, lang, tld) -> bytes ou None ; un échec (hors-ligne...) n'est jamais mis en cache.
+class AudioCache:
+    def __init__(self, synthesize, directory=AUDIO_CACHE_DIR, max_bytes=DISK_LIMIT_BYTES, memory_items=MEMORY_ITEMS, workers=4, offline=False):
+        self.synthesize = synthesize
+        self.always_offline = offline
+        self.offline_until = 0.0
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        os.makedirs(directory, exist_ok=True)
+        self.disk_bytes = sum(e.stat().st_size for e in os.scandir(directory) if e.name.endswith(".mp3"))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".mp3")
+
+    @property
+    def offline(self):
+        # Hors-ligne : seul le cache (sons déjà générés ou importés par un pack) est utilisé
+        return self.always_offline or time.monotonic() < self.offline_until
+
+    # --- LECTURE ---
+    def cached(self, text, lang='pt', tld='pt'):
+        key = cache_key(text, lang, tld)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f: data = f.read()
+            os.utime(path)  # La date de modification sert d'horodatage LRU
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def get(self, text, lang='pt', tld='pt'):
+        data = self.cached(text, lang, tld)
+        if data is not None: return data
+        key = cache_key(text, lang, tld)
+        with self.lock: future = self.inflight.get(key)
+        if future is not None:
+            # Déjà en cours de préchargement : on attend ce résultat plutôt que de relancer gTTS
+            try: return future.result(timeout=15)
+            except: return None
+        return self._synthesize(key, text, lang, tld)
+
+    # --- PRÉCHARGEMENT ---
+    def prefetch(self, items):
+        futures = []
+        if self.offline: return futures
+        for text, lang, tld in items:
+            key = cache_key(text, lang, tld)
+            with self.lock:
+                if key in self.memory: continue
+                future = self.inflight.get(key)
+                if future is None and not os.path.exists(self._path(key)):
+                    future = self.pool.submit(self._synthesize, key, text, lang, tld)
+                    self.inflight[key] = future
+            if future is not None: futures.append(future)
+        return futures
+
+    # --- ÉCRITURE ---
+    def _synthesize(self, key, text, lang, tld):
+        try:
+            if self.offline: return None
+            data = self.synthesize(text, lang, tld)
+            if data: self._store(key, data)
+            else: self.offline_until = time.monotonic() + OFFLINE_RETRY
+            return data
+        finally:
+            with self.lock: self.inflight.pop(key, None)
+
+    def add(self, key, data):
+        # Son fourni de l'extérieur (pack hors-ligne), rangé sous sa clé de contenu
+        if not self.cached_key(key): self._store(key, data)
+
+    def cached_key(self, key):
+        with self.lock:
+            if key in self.memory: return True
+        return os.path.exists(self._path(key))
+
+    def _remember(self, key, data):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_items: self.memory.popitem(last=False)
+
+    def _store(self, key, data):
+        self._remember(key, data)
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f: f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self.lock:
+            self.disk_bytes += len(data)
+            if self.disk_bytes > self.max_bytes: self._evict()
+
+    def _evict(self):
+        # Supprime les fichiers les moins récemment utilisés jusqu'à repasser sous 90 % du plafond
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(self.directory) if e.name.endswith(".mp3")))
+        self.disk_bytes = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self.disk_bytes <= target: break
+            try:
+                os.remove(path)
+                self.disk_bytes -= size
+            except OSError:
+                pass
@@ -0,0 +1,235 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(REPO, "main.py")
+PIN = "1234"
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+IMPORT_ROWS = 1_000
+SEARCH_QUERY = "ca"
+HEAVY_MODULES = ("pandas", "numpy", "gtts", "github", "speech_recognition", "openpyxl")
+
+# --- DECKS SYNTHÉTIQUES ---
+PT_SYLLABLES = ["ca", "sa", "ra", "lo", "me", "ção", "nh", "ba", "te", "vi", "gu", "lh", "pe", "do", "mã", "ri", "zo", "fe", "qu", "ão"]
+FR_SYLLABLES = ["ma", "son", "che", "ri", "pa", "vé", "lo", "tin", "bou", "ré", "cou", "ge", "mi", "pon", "dé", "ta", "fleu", "nu", "au", "et"]
+PT_ARTICLES = ["", "", "o ", "a ", "os ", "as "]
+
+def _word(rng, syllables):
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+def make_deck(n, seed=0, now=None):
+    # Répartition réaliste : tailles de listes en loi de Zipf, 40 % de mots jamais vus (à réviser),
+    # les autres étalés entre retard (jusqu'à 30 jours) et révisions à venir (jusqu'à 60 jours)
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    n_cats = max(3, int(n ** 0.5) // 4)
+    cats = [f"Liste {i + 1}" for i in range(n_cats)]
+    weights = [1 / (i + 1) for i in range(n_cats)]
+    vocabulary = []
+    for category in rng.choices(cats, weights, k=n):
+        if rng.random() < 0.4:
+            score, score_app = 0, 0
+            due = due_app = now - timedelta(hours=rng.uniform(0, 48))
+        else:
+            score = rng.choice([-2, -1, 1, 1, 2, 2, 3, 3, 4, 5, 6])
+            score_app = max(0, score + rng.randint(-1, 2))
+            due = now + timedelta(days=rng.uniform(-30, 60))
+            due_app = now + timedelta(days=rng.uniform(-10, 30))
+        vocabulary.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "category": category,
+            "term_target": rng.choice(PT_ARTICLES) + _word(rng, PT_SYLLABLES), "term_primary": _word(rng, FR_SYLLABLES),
+            "srs_data": {"score": score, "score_apprentissage": score_app, "next_review_date": due.isoformat(timespec="seconds"), "next_review_date_apprentissage": due_app.isoformat(timespec="seconds")}
+        })
+    return {"schema_version": 2, "vocabulary": vocabulary}
+
+def make_xlsx(rows, seed=1):
+    from openpyxl import Workbook
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Portugais", "Français"])
+    for i in range(rows): ws.append([f"{_word(rng, PT_SYLLABLES)} {i}", _word(rng, FR_SYLLABLES)])
+    fp = io.BytesIO()
+    wb.save(fp)
+    return fp.getvalue()
+
+# --- SERVICES EXTERNES NEUTRALISÉS ---
+# gTTS renvoie un faux mp3, GitHub refuse toute connexion, la reconnaissance vocale passe par le moteur "stub"
+def install_stubs():
+    import gtts
+    import github
+    gtts.gTTS.write_to_fp = lambda self, fp: fp.write(b"ID3" + self.text.encode("utf-8"))
+    def offline(*args, **kwargs): raise RuntimeError("GitHub désactivé pendant le benchmark")
+    github.Github = offline
+
+def reset_caches():
+    # Chaque mesure part à froid : caches Streamlit et mémoïsations
+    import streamlit as st
+    import card_store
+    import matching
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    matching.normalize_text.cache_clear()
+    matching.accepted_forms.cache_clear()
+    matching.loose_forms.cache_clear()
+    card_store._parse_ts.cache_clear()
+    gc.collect()
+
+# --- SCÉNARIO ---
+class Run:
+    def __init__(self, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(MAIN, default_timeout=timeout)
+        self.at.secrets["MY_PIN"] = PIN
+        self.at.secrets["SPEECH_BACKEND"] = "stub"
+        self.timings = {}
+
+    def check(self):
+        if self.at.exception: raise RuntimeError(self.at.exception[0].message)
+
+    def timed(self, name, widget):
+        start = time.perf_counter()
+        widget.run()
+        self.timings[name] = (time.perf_counter() - start) * 1000
+        self.check()
+
+    def button(self, prefix):
+        return next(b for b in self.at.button if b.label.startswith(prefix))
+
+    def goto(self, page):
+        self.at.sidebar.radio[0].set_value(page).run()
+        self.check()
+
+    def quiz(self, exo, prefix):
+        # Lance une session SRS puis répond "Je ne sais pas" et passe à la question suivante
+        self.at.radio(key="exo_choice").set_value(exo).run()
+        self.timed(f"{prefix}_session", self.button("LANCER (SRS)").click())
+        if not any(b.label == "🤷 Je ne sais pas" for b in self.at.button): return
+        self.button("🤷 Je ne sais pas").click().run()
+        self.timed(f"{prefix}_next_question", self.button("CONTINUER").click())
+        self.button("🛑 Quitter la session").click().run()
+
+    def scenario(self, xlsx):
+        at = self.at
+        at.run()
+        self.timed("cold_load", at.text_input[0].input(PIN))
+        self.goto("Entraînement (Quiz)")
+        self.quiz("Quiz Écrit", "srs")
+        self.quiz("QCM", "qcm")
+        self.goto("Paramètres")
+        self.timed("excel_import", at.file_uploader[0].set_value(("benchmark.xlsx", xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")))
+        self.goto("Dictionnaires 📖")
+        self.timed("library_render", at.sidebar.radio[0].set_value("Bibliothèque"))
+        self.timed("library_search", at.text_input(key="library_query").input(SEARCH_QUERY))
+        return self.timings
+
+def bench_size(n, repeat, timeout, xlsx, fmt):
+    from storage import COMPACT_SUFFIX, write_snapshot
+    deck = make_deck(n)
+    runs = []
+    for _ in range(repeat):
+        work = tempfile.mkdtemp(prefix=f"lingo_bench_{n}_")
+        cwd = os.getcwd()
+        try:
+            os.chdir(work)
+            path = "vocab_db" + (COMPACT_SUFFIX if fmt == "lingo" else ".json")
+            write_snapshot(deck, path)
+            size = os.path.getsize(path)
+            reset_caches()
+            runs.append(Run(timeout).scenario(xlsx))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(work, ignore_errors=True)
+    ops = sorted({op for r in runs for op in r})
+    timings = {op: {"median_ms": round(statistics.median(r[op] for r in runs if op in r), 2), "min_ms": round(min(r[op] for r in runs if op in r), 2), "runs_ms": [round(r[op], 2) for r in runs if op in r]} for op in ops}
+    return {"cards": n, "deck_bytes": size, "timings": timings}
+
+# --- DÉMARRAGE À FROID ---
+# Premier affichage (écran du PIN) dans un processus neuf : mesure le coût des imports de main.py
+STARTUP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+sys.path.insert(0, {repo!r})
+start = time.perf_counter()
+at = AppTest.from_file({main!r}, default_timeout=120)
+at.secrets["MY_PIN"] = "0000"
+at.run()
+print(json.dumps({{"pin_screen_ms": (time.perf_counter() - start) * 1000, "heavy_modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure_startup(repeat):
+    code = STARTUP_SCRIPT.format(repo=REPO, main=MAIN, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=tempfile.gettempdir(), capture_output=True, text=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    times = [r["pin_screen_ms"] for r in runs]
+    return {"pin_screen_ms": {"median_ms": round(statistics.median(times), 2), "min_ms": round(min(times), 2), "runs_ms": [round(t, 2) for t in times]}, "heavy_modules_loaded": runs[-1]["heavy_modules"]}
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True).stdout.strip() or None
+    except: return None
+
+# --- COMPARAISON ENTRE DEUX RAPPORTS ---
+def compare(old_path, new_path, threshold=1.2):
+    with open(old_path, encoding="utf-8") as f: old = json.load(f)
+    with open(new_path, encoding="utf-8") as f: new = json.load(f)
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    regressions = 0
+    if "startup" in old and "startup" in new:
+        before, after = old["startup"]["pin_screen_ms"]["median_ms"], new["startup"]["pin_screen_ms"]["median_ms"]
+        ratio = after / max(before, 1e-6)
+        regressions += ratio > threshold
+        print(f"{'startup':>8} {'pin_screen':<20} {before:>10.1f} ms -> {after:>10.1f} ms  x{ratio:.2f}{' <-- régression' if ratio > threshold else ''}")
+    for size, result in new["sizes"].items():
+        before = old["sizes"].get(size, {}).get("timings", {})
+        for op, t in result["timings"].items():
+            if op not in before: continue
+            ratio = t["median_ms"] / max(before[op]["median_ms"], 1e-6)
+            flag = " <-- régression" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{size:>8} {op:<20} {before[op]['median_ms']:>10.1f} ms -> {t['median_ms']:>10.1f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+# python benchmark.py [--sizes 1000,10000] [--repeat 3] [--format json|lingo] [--out benchmark_report.json]
+# python benchmark.py compare ancien.json nouveau.json
+def main(argv):
+    if argv[:1] == ["compare"]:
+        if len(argv) != 3: sys.exit("Usage : python benchmark.py compare ANCIEN.json NOUVEAU.json")
+        sys.exit(1 if compare(argv[1], argv[2]) else 0)
+    parser = argparse.ArgumentParser(description="Benchmark de LingoClone sur des decks synthétiques")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", choices=("json", "lingo"), default="json")
+    parser.add_argument("--timeout", type=float, default=900)
+    parser.add_argument("--out", default="benchmark_report.json")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO)
+    install_stubs()
+    xlsx = make_xlsx(IMPORT_ROWS)
+    report = {"commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "format": args.format, "repeat": args.repeat, "import_rows": IMPORT_ROWS, "sizes": {}}
+    report["startup"] = measure_startup(args.repeat)
+    print(f"Démarrage à froid (écran du PIN) : {report['startup']['pin_screen_ms']['median_ms']:.0f} ms, modules lourds chargés : {', '.join(report['startup']['heavy_modules_loaded']) or 'aucun'}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        start = time.perf_counter()
+        result = report["sizes"][str(n)] = bench_size(n, args.repeat, args.timeout, xlsx, args.format)
+        print(f"{n:>8} cartes ({time.perf_counter() - start:.0f}s) : " + ", ".join(f"{op} {t['median_ms']:.0f} ms" for op, t in result["timings"].items()))
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Rapport écrit dans {args.out}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
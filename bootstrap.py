@@ -0,0 +1,45 @@
+import gc
+from datetime import datetime
+from storage import ReviewJournal, file_lock, read_snapshot, write_snapshot
+
+SCHEMA_VERSION = 2  # 2 : category, score, score_apprentissage et next_review_date_apprentissage toujours présents
+
+# --- MIGRATION DU SCHÉMA ---
+def migrate_db(db):
+    # Complète les anciennes cartes ; ne parcourt le deck que si la base n'est pas déjà à jour
+    if db.get("schema_version", 0) >= SCHEMA_VERSION: return False
+    now = datetime.now().isoformat()
+    for c in db.get("vocabulary", []):
+        if "category" not in c: c["category"] = "Général"
+        if "score" not in c["srs_data"]: c["srs_data"]["score"] = c["srs_data"].get("box_level", 0)
+        if "score_apprentissage" not in c["srs_data"]: c["srs_data"]["score_apprentissage"] = 0
+        if "next_review_date_apprentissage" not in c["srs_data"]: c["srs_data"]["next_review_date_apprentissage"] = c["srs_data"].get("next_review_date", now)
+    db["schema_version"] = SCHEMA_VERSION
+    return True
+
+def load_deck(path, journal_db_path=None):
+    # Lecture + migration, la forme migrée est réécrite une fois pour toutes.
+    # Un ancien journal de révisions (avant la base de progression) est intégré puis vidé.
+    with file_lock(path):
+        db = read_snapshot(path)
+        changed = migrate_db(db)
+        journal = ReviewJournal(journal_db_path) if journal_db_path else None
+        if journal and journal.pending:
+            journal.replay(db)
+            changed = True
+        if changed: write_snapshot(db, path)
+        if journal and journal.pending: journal.clear()
+    return db
+
+# --- COPIE PAR SESSION ---
+# Le deck partagé n'est jamais modifié : chaque session reçoit ses propres dicts de carte et de
+# progression (srs_data), les chaînes (termes, catégories) restant partagées.
+def session_copy(deck):
+    db = {k: v for k, v in deck.items() if k != "vocabulary"}
+    # Des centaines de milliers de petits dicts : sans pause du GC, la copie passe surtout en collectes inutiles
+    enabled = gc.isenabled()
+    gc.disable()
+    try: db["vocabulary"] = [{**c, "srs_data": c["srs_data"].copy()} for c in deck.get("vocabulary", [])]
+    finally:
+        if enabled: gc.enable()
+    return db
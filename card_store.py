@@ -0,0 +1,115 @@
+import bisect
+import gc
+from datetime import datetime
+from functools import lru_cache
+
+DEFAULT_CATEGORY = "Général"
+DUE_KEYS = ("next_review_date", "next_review_date_apprentissage")
+
+@lru_cache(maxsize=1 << 18)
+def _parse_ts(value):
+    # Mémorisé : les sessions suivantes retrouvent les mêmes dates sans les reparser
+    return datetime.fromisoformat(value).timestamp()
+
+def _due_ts(card, key):
+    # Date absente ou illisible : la carte est considérée comme à réviser tout de suite
+    try: return _parse_ts(card["srs_data"][key])
+    except: return 0.0
+
+# --- INDEX DES CARTES ---
+# Les cartes restent les dicts de db["vocabulary"] ; le store ne fait que les indexer :
+#   - by_id : id -> carte
+#   - by_category : catégorie -> liste de cartes
+#   - due : (catégorie, clé de date) -> liste triée de (timestamp, id)
+class CardStore:
+    def __init__(self, db):
+        self.db = db
+        self.rebuild()
+
+    def rebuild(self):
+        cards = self.db["vocabulary"]
+        enabled = gc.isenabled()
+        gc.disable()  # Construction en masse : inutile de déclencher des collectes à chaque allocation
+        try:
+            self.by_id = {c["id"]: c for c in cards}
+            self.by_category = {}
+            for c in cards: self.by_category.setdefault(c.get("category", DEFAULT_CATEGORY), []).append(c)
+            self.due = {}
+            self._due_ts = {}
+            for key in DUE_KEYS:
+                ts = self._due_ts[key] = {c["id"]: _due_ts(c, key) for c in cards}
+                for cat, group in self.by_category.items():
+                    self.due[(cat, key)] = sorted([(ts[c["id"]], c["id"]) for c in group])
+        finally:
+            if enabled: gc.enable()
+        self._categories = None
+
+    def _index(self, card):
+        cat = card.get("category", DEFAULT_CATEGORY)
+        self.by_id[card["id"]] = card
+        self.by_category.setdefault(cat, []).append(card)
+        for key in DUE_KEYS:
+            ts = _due_ts(card, key)
+            self._due_ts[key][card["id"]] = ts
+            entries = self.due.setdefault((cat, key), [])
+            bisect.insort(entries, (ts, card["id"]))
+
+    # --- LECTURE ---
+    def get(self, card_id):
+        return self.by_id.get(card_id)
+
+    def categories(self):
+        if self._categories is None: self._categories = sorted(self.by_category)
+        return self._categories
+
+    def count(self, categories):
+        return sum(len(self.by_category.get(cat, [])) for cat in categories)
+
+    def cards(self, categories):
+        return [c for cat in categories for c in self.by_category.get(cat, [])]
+
+    def due_cards(self, key, categories, now=None):
+        # Seules les entrées échues sont parcourues : aucune date n'est reparsée
+        limit = (now or datetime.now()).timestamp()
+        result = []
+        for cat in categories:
+            entries = self.due.get((cat, key), [])
+            stop = bisect.bisect_right(entries, (limit, "\uffff"))
+            result.extend(self.by_id[cid] for _, cid in entries[:stop])
+        return result
+
+    def due_counts(self, key, categories, days, now=None):
+        # Cartes à réviser par jour calendaire (jour 0 = en retard + aujourd'hui), sans parcourir les cartes
+        now = now or datetime.now()
+        midnight = datetime.combine(now.date(), datetime.min.time()).timestamp()
+        counts = [0] * days
+        for cat in categories:
+            entries = self.due.get((cat, key), [])
+            prev = 0
+            for i in range(days):
+                stop = bisect.bisect_left(entries, (midnight + (i + 1) * 86400, ""))
+                counts[i] += stop - prev
+                prev = stop
+        return counts
+
+    def due_timestamps(self, key):
+        # id -> timestamp déjà parsé, réutilisable sans relire les dates ISO
+        return self._due_ts[key]
+
+    # --- MISES À JOUR ---
+    def update_due(self, card_id, key):
+        # À appeler après chaque modification d'une date de révision
+        card = self.by_id[card_id]
+        entries = self.due[(card.get("category", DEFAULT_CATEGORY), key)]
+        old = (self._due_ts[key][card_id], card_id)
+        i = bisect.bisect_left(entries, old)
+        if i < len(entries) and entries[i] == old: del entries[i]
+        ts = _due_ts(card, key)
+        self._due_ts[key][card_id] = ts
+        bisect.insort(entries, (ts, card_id))
+
+    def add(self, cards):
+        for c in cards:
+            self.db["vocabulary"].append(c)
+            self._index(c)
+        self._categories = None
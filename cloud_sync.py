@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import threading
+import metrics
+
+SNAPSHOT_PATH = "vocab_db.json"
+DELTA_PATH = "vocab_db.delta.json"
+STATE_PATH = ".sync_state.json"
+PENDING_PATH = ".sync_pending"
+FOLD_THRESHOLD = 2000  # Au-delà de ce nombre de cartes dans le delta distant, on le fusionne dans le snapshot
+MAX_RETRIES = 3
+
+class ConflictError(Exception):
+    pass
+
+# --- BACKENDS DE STOCKAGE DISTANT ---
+# read(path) -> (bytes, sha) ou (None, None) ; write(path, data, sha, message) -> nouveau sha.
+# write lève ConflictError si le fichier distant n'a plus le sha attendu.
+class LocalDirBackend:
+    # Remplaçant local de GitHub (un simple dossier) pour travailler et tester hors-ligne
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.commits = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def read(self, path):
+        try:
+            with open(os.path.join(self.directory, path), "rb") as f: data = f.read()
+        except FileNotFoundError:
+            return None, None
+        return data, hashlib.sha1(data).hexdigest()
+
+    def write(self, path, data, sha, message):
+        with self.lock:
+            _, current = self.read(path)
+            if current != sha: raise ConflictError(path)
+            full = os.path.join(self.directory, path)
+            with open(full + ".tmp", "wb") as f: f.write(data)
+            os.replace(full + ".tmp", full)
+            self.commits += 1
+            return hashlib.sha1(data).hexdigest()
+
+class GithubBackend:
+    def __init__(self, repo):
+        self.repo = repo
+
+    @metrics.instrument("github.read")
+    def read(self, path):
+        try: contents = self.repo.get_contents(path)
+        except Exception as e:
+            if getattr(e, "status", None) == 404: return None, None
+            raise
+        metrics.add_bytes("github.read", contents.size or 0)
+        return contents.decoded_content, contents.sha
+
+    @metrics.instrument("github.write")
+    def write(self, path, data, sha, message):
+        metrics.add_bytes("github.write", len(data))
+        try:
+            if sha: result = self.repo.update_file(path, message, data, sha)
+            else: result = self.repo.create_file(path, message, data)
+        except Exception as e:
+            # 409 : sha périmé ; 422 : le fichier a été créé entre-temps
+            if getattr(e, "status", None) in (409, 422): raise ConflictError(path)
+            raise
+        return result["content"].sha
+
+# --- DELTA ---
+# {"cards": {card_id: {clé srs: [valeur, horodatage]}}} : fusion clé par clé, la révision la plus récente gagne.
+def merge_delta(target, source):
+    changed = 0
+    for card_id, fields in source.items():
+        entry = target.setdefault(card_id, {})
+        for key, (value, t) in fields.items():
+            if key not in entry or entry[key][1] < t:
+                entry[key] = [value, t]
+                changed += 1
+    return changed
+
+def apply_delta(db, delta):
+    cards = {c["id"]: c for c in db.get("vocabulary", [])}
+    for card_id, fields in delta.items():
+        card = cards.get(card_id)
+        if card is None: continue
+        for key, (value, _) in fields.items(): card["srs_data"][key] = value
+
+def _loads(data, default):
+    return json.loads(data.decode("utf-8")) if data else default
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# --- MOTEUR DE SYNCHRONISATION ---
+# Les révisions sont accumulées localement (PENDING_PATH, une ligne par réponse) sur autant de sessions
+# que nécessaire, puis poussées en un seul commit sous forme de delta compacté.
+class SyncEngine:
+    def __init__(self, backend, local_dir="."):
+        self.backend = backend
+        self.state_path = os.path.join(local_dir, STATE_PATH)
+        self.pending_path = os.path.join(local_dir, PENDING_PATH)
+        self.inflight_path = self.pending_path + ".push"
+        self.lock = threading.Lock()
+        self.state = {"snapshot_sha": None, "delta_sha": None, "full": False}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f: self.state.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def _save_state(self):
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f: json.dump(self.state, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    # --- CÔTÉ LOCAL ---
+    def record(self, card_id, srs_update, t):
+        line = json.dumps({"id": card_id, "srs": srs_update, "t": t}, ensure_ascii=False, separators=(",", ":"))
+        with self.lock, open(self.pending_path, "a", encoding="utf-8") as f: f.write(line + "\n")
+
+    def record_many(self, updates, t):
+        # Opérations en masse (réinitialisation, changement d'algorithme) : une ligne horodatée par carte,
+        # pour qu'elles l'emportent sur les révisions plus anciennes du delta distant
+        lines = "".join(json.dumps({"id": card_id, "srs": srs_update, "t": t}, ensure_ascii=False, separators=(",", ":")) + "\n" for card_id, srs_update in updates.items())
+        with self.lock, open(self.pending_path, "a", encoding="utf-8") as f: f.write(lines)
+
+    def mark_full(self):
+        # Le jeu de cartes a changé (import, suppression) : le prochain push enverra le snapshot complet
+        with self.lock:
+            self.state["full"] = True
+            self._save_state()
+
+    def pending(self):
+        delta = {}
+        for path in (self.inflight_path, self.pending_path):
+            if not os.path.exists(path): continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try: rec = json.loads(line)
+                    except ValueError: continue
+                    merge_delta(delta, {rec["id"]: {k: [v, rec["t"]] for k, v in rec["srs"].items()}})
+        return delta
+
+    def _take_pending(self):
+        # Les réponses en attente passent dans un fichier "en cours d'envoi" : celles qui arrivent pendant
+        # le push restent dans PENDING_PATH, et un push échoué sera simplement repris au suivant.
+        with self.lock:
+            if os.path.exists(self.pending_path):
+                with open(self.pending_path, "r", encoding="utf-8") as src, open(self.inflight_path, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(self.pending_path)
+        return self.pending()
+
+    # --- LECTURE DISTANTE ---
+    def pull(self):
+        # Renvoie (db distante avec son delta appliqué, delta distant) ou (None, {}) si rien en ligne
+        data, sha = self.backend.read(SNAPSHOT_PATH)
+        if data is None: return None, {}
+        db = _loads(data, {"vocabulary": []})
+        delta_data, delta_sha = self.backend.read(DELTA_PATH)
+        remote = _loads(delta_data, {"cards": {}})["cards"]
+        apply_delta(db, remote)
+        with self.lock:
+            self.state.update(snapshot_sha=sha, delta_sha=delta_sha)
+            self._save_state()
+        return db, remote
+
+    # --- ENVOI ---
+    def push(self, db, message="Mise à jour progression LingoClone"):
+        local = self._take_pending()
+        if not local and not self.state["full"]: return {"cards": 0, "commits": 0}
+        for _ in range(MAX_RETRIES):
+            try:
+                stats = self._push_once(db, local, message)
+                break
+            except ConflictError:
+                continue  # Le distant a bougé entre-temps : on relit, on refusionne, on réessaie
+        else:
+            raise ConflictError("synchronisation impossible après plusieurs tentatives")
+        with self.lock:
+            if os.path.exists(self.inflight_path): os.remove(self.inflight_path)
+            self.state["full"] = False
+            self._save_state()
+        return stats
+
+    def _push_once(self, db, local, message):
+        snap_data, snap_sha = self.backend.read(SNAPSHOT_PATH)
+        delta_data, delta_sha = self.backend.read(DELTA_PATH)
+        remote = _loads(delta_data, {"cards": {}})["cards"]
+        commits = 0
+
+        if snap_data is None or self.state["full"]:
+            # Snapshot complet : la liste de cartes locale fait foi. La progression part de celle du snapshot
+            # distant (réponses déjà envoyées, y compris depuis d'autres appareils), puis le delta est fusionné
+            merged = dict(remote)
+            merge_delta(merged, local)
+            out = json.loads(json.dumps(db))
+            known = {c["id"]: c["srs_data"] for c in _loads(snap_data, {"vocabulary": []}).get("vocabulary", [])}
+            for c in out.get("vocabulary", []):
+                if c["id"] in known: c["srs_data"].update(known[c["id"]])
+            apply_delta(out, merged)
+            snap_sha = self.backend.write(SNAPSHOT_PATH, _dumps(out), snap_sha, message)
+            delta_sha = self.backend.write(DELTA_PATH, _dumps({"cards": {}}), delta_sha, message) if delta_data is not None else None
+            commits = 2 if delta_data is not None else 1
+        else:
+            merge_delta(remote, local)
+            if len(remote) > FOLD_THRESHOLD:
+                # Delta trop gros : on le replie dans le snapshot distant
+                out = _loads(snap_data, {"vocabulary": []})
+                apply_delta(out, remote)
+                snap_sha = self.backend.write(SNAPSHOT_PATH, _dumps(out), snap_sha, message)
+                delta_sha = self.backend.write(DELTA_PATH, _dumps({"cards": {}}), delta_sha, message)
+                commits = 2
+            else:
+                delta_sha = self.backend.write(DELTA_PATH, _dumps({"cards": remote}), delta_sha, message)
+                commits = 1
+
+        with self.lock:
+            self.state.update(snapshot_sha=snap_sha, delta_sha=delta_sha)
+        return {"cards": len(local), "commits": commits}
@@ -0,0 +1,126 @@
+import random
+from card_store import DEFAULT_CATEGORY
+from matching import bounded_levenshtein, normalize_text as _fold
+
+FIELDS = ("term_target", "term_primary")
+
+def _distance(a, b):
+    # Le BK-tree a besoin de la distance exacte : borne = longueur du plus long mot, jamais dépassée
+    return bounded_levenshtein(a, b, max(len(a), len(b)))
+
+def _affix(a, b):
+    # Longueur du préfixe + suffixe communs : "falar"/"falou" se ressemblent plus que leur distance ne le dit
+    p = 0
+    while p < min(len(a), len(b)) and a[p] == b[p]: p += 1
+    s = 0
+    while s < min(len(a), len(b)) - p and a[-1 - s] == b[-1 - s]: s += 1
+    return p + s
+
+# --- BK-TREE (RECHERCHE DE VOISINS PAR DISTANCE D'ÉDITION) ---
+class BKTree:
+    def __init__(self):
+        self.root = None  # [mot, {distance: enfant}]
+
+    def add(self, word):
+        if self.root is None:
+            self.root = [word, {}]
+            return
+        node = self.root
+        while True:
+            d = _distance(word, node[0])
+            if d == 0: return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [word, {}]
+                return
+            node = child
+
+    def search(self, word, radius):
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = _distance(word, node[0])
+            if d <= radius: found.append((d, node[0]))
+            for dist, child in node[1].items():
+                if d - radius <= dist <= d + radius: stack.append(child)
+        return found
+
+# --- INDEX DES DISTRACTEURS QCM ---
+# Pour chaque (catégorie, sens) : la liste des réponses possibles, sans doublon.
+# Tirage aléatoire en O(1) ; distracteurs "difficiles" via un BK-tree construit à la première demande.
+class DistractorIndex:
+    def __init__(self, cards=()):
+        self.terms = {}
+        self.seen = {}
+        self.trees = {}
+        self.folded = {}
+        self.hard_cache = {}
+        self.add(cards)
+
+    def add(self, cards):
+        for c in cards:
+            cat = c.get("category", DEFAULT_CATEGORY)
+            for field in FIELDS:
+                term = c[field]
+                key = (cat, field)
+                seen = self.seen.setdefault(key, set())
+                if term in seen: continue
+                seen.add(term)
+                self.terms.setdefault(key, []).append(term)
+                folded = _fold(term)
+                self.folded.setdefault(key, {}).setdefault(folded, term)
+                if key in self.trees: self.trees[key].add(folded)
+        self.hard_cache.clear()
+
+    def sample(self, categories, field, answer, k=3):
+        pools = [self.terms[(cat, field)] for cat in categories if (cat, field) in self.terms]
+        total = sum(len(p) for p in pools)
+        if total <= 4 * k:
+            # Petites listes : on filtre directement
+            others = list({t for p in pools for t in p if t != answer})
+            return random.sample(others, min(k, len(others)))
+        picked = []
+        attempts = 0
+        # Tirage par rejet : pas de copie ni de filtrage de la liste, le coût ne dépend pas du deck
+        while len(picked) < k and attempts < 20 * k:
+            attempts += 1
+            i = random.randrange(total)
+            for p in pools:
+                if i < len(p): break
+                i -= len(p)
+            term = p[i]
+            if term != answer and term not in picked: picked.append(term)
+        return picked
+
+    def _tree(self, key):
+        tree = self.trees.get(key)
+        if tree is None:
+            tree = self.trees[key] = BKTree()
+            for folded in self.folded[key]: tree.add(folded)
+        return tree
+
+    def warm(self, categories):
+        # Construction des BK-trees en une passe, au lancement de la session plutôt qu'à la première question
+        for cat in categories:
+            for field in FIELDS:
+                if (cat, field) in self.terms: self._tree((cat, field))
+
+    def hard(self, category, field, answer, k=3):
+        key = (category, field)
+        if key not in self.terms: return []
+        cache_key = (key, answer)
+        if cache_key in self.hard_cache: return list(self.hard_cache[cache_key])
+        tree = self._tree(key)
+        target = _fold(answer)
+        # Rayon élargi progressivement jusqu'à trouver assez de voisins proches (au-delà, ce ne sont plus des pièges)
+        found = []
+        radius = 1
+        while radius <= max(2, len(target) // 2):
+            found = [(d, w) for d, w in tree.search(target, radius) if w != target]
+            if len(found) >= k: break
+            radius += 1
+        found.sort(key=lambda dw: (dw[0] / max(len(target), len(dw[1]), 1), -_affix(target, dw[1])))
+        result = [self.folded[key][w] for _, w in found[:k]]
+        self.hard_cache[cache_key] = result
+        return list(result)
@@ -0,0 +1,210 @@
+import heapq
+import json
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+HISTORY_DIR = "history"
+SEGMENT_RECORDS = 100_000  # ~3,3 Mo par segment
+MAX_SEGMENTS = 50          # Au-delà, les segments les plus anciens sont supprimés (les agrégats restent)
+FLUSH_EVERY = 100          # Réponses entre deux sauvegardes des agrégats
+
+MODES = ("Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Orale 🎙️")
+EXERCISES = ("flashcard", "ecrit", "qcm", "oral")
+SESSIONS = ("srs", "libre", "infini")
+DIRECTIONS = ("pt-fr", "fr-pt")
+
+# Enregistrement binaire de taille fixe (33 octets) : horodatage, carte (uuid), liste, mode, sens,
+# exercice, type de session, réussite, temps de réponse en ms
+RECORD = struct.Struct("<d16sHBBBBBI")
+
+def _code(values, value):
+    return values.index(value) if value in values else 255
+
+def _empty_stats():
+    return {"version": 1, "logged": 0, "categories": {}, "days": {}, "modes": {}, "cards": {}, "streak": {"last": None, "current": 0, "best": 0}}
+
+# --- HISTORIQUE DES RÉVISIONS ---
+# Journal binaire en segments tournants (history/<utilisateur>/reviews-000000.bin, ...) + agrégats
+# tenus à jour en O(1) par réponse et sauvegardés régulièrement dans stats.json. Au démarrage, seules les
+# réponses écrites après la dernière sauvegarde sont relues : le coût ne dépend pas de la taille de l'historique.
+class ReviewHistory:
+    def __init__(self, directory, segment_records=SEGMENT_RECORDS, max_segments=MAX_SEGMENTS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.categories = self._read_categories()
+        self.category_codes = {c: i for i, c in enumerate(self.categories)}
+        self.card_ids = self._read_card_ids()
+        try:
+            with open(self._path("stats.json"), encoding="utf-8") as f: self.stats = json.load(f)
+        except: self.stats = _empty_stats()
+        self.dirty = 0
+        self._replay_tail()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segment(self, n):
+        return self._path(f"reviews-{n:06d}.bin")
+
+    # --- LISTES (table d'index, ajout seul) ---
+    def _read_categories(self):
+        try:
+            with open(self._path("categories.txt"), encoding="utf-8") as f: return f.read().splitlines()
+        except FileNotFoundError: return []
+
+    def _category_code(self, category):
+        code = self.category_codes.get(category)
+        if code is not None: return code
+        with open(self._path("categories.txt"), "a", encoding="utf-8") as f: f.write(category + "\n")
+        code = self.category_codes[category] = len(self.categories)
+        self.categories.append(category)
+        return code
+
+    # --- IDENTIFIANTS NON-UUID (table d'index, ajout seul) ---
+    # Un identifiant qui n'est pas un uuid canonique est enregistré sous une empreinte uuid5 ;
+    # ids.jsonl permet de retrouver l'identifiant d'origine à la relecture.
+    def _read_card_ids(self):
+        ids = {}
+        try:
+            with open(self._path("ids.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    try: digest, card_id = json.loads(line)
+                    except ValueError: continue  # Ligne tronquée (arrêt brutal)
+                    ids[bytes.fromhex(digest)] = card_id
+        except FileNotFoundError: pass
+        return ids
+
+    def _card_bytes(self, card_id):
+        try:
+            raw = uuid.UUID(card_id)
+            if str(raw) == card_id: return raw.bytes
+        except: pass
+        raw = uuid.uuid5(uuid.NAMESPACE_URL, card_id).bytes
+        if raw not in self.card_ids:
+            with open(self._path("ids.jsonl"), "a", encoding="utf-8") as f: f.write(json.dumps([raw.hex(), card_id], ensure_ascii=False) + "\n")
+            self.card_ids[raw] = card_id
+        return raw
+
+    def _card_id(self, raw):
+        card_id = self.card_ids.get(raw)
+        return card_id if card_id is not None else str(uuid.UUID(bytes=raw))
+
+    # --- ÉCRITURE ---
+    def record(self, card_id, category, mode, direction, exercise, session, correct, response_ms, t=None):
+        t = t or time.time()
+        with self.lock:
+            raw = RECORD.pack(t, self._card_bytes(card_id), self._category_code(category), _code(MODES, mode), _code(DIRECTIONS, direction), _code(EXERCISES, exercise), _code(SESSIONS, session), bool(correct), max(0, min(int(response_ms), 0xFFFFFFFF)))
+            n = self.stats["logged"]
+            fd = os.open(self._segment(n // self.segment_records), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try: os.write(fd, raw)
+            finally: os.close(fd)
+            self._aggregate(card_id, category, mode, bool(correct), response_ms, t)
+            if (n + 1) % self.segment_records == 0: self._rotate((n + 1) // self.segment_records)
+            self.dirty += 1
+            if self.dirty >= FLUSH_EVERY: self._flush()
+
+    def _aggregate(self, card_id, category, mode, correct, response_ms, t):
+        # Mise à jour en temps constant de tous les agrégats affichés dans les statistiques
+        s = self.stats
+        s["logged"] += 1
+        for table, key in ((s["categories"], category), (s["modes"], mode)):
+            entry = table.setdefault(key, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += correct
+            entry[2] += response_ms
+        day = date.fromtimestamp(t).isoformat()
+        daily = s["days"].setdefault(day, [0, 0])
+        daily[0] += 1
+        daily[1] += correct
+        card = s["cards"].setdefault(card_id, [0, 0])
+        card[0] += 1
+        card[1] += not correct
+        streak = s["streak"]
+        if streak["last"] != day:
+            yesterday = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+            streak["current"] = streak["current"] + 1 if streak["last"] == yesterday else 1
+            streak["best"] = max(streak["best"], streak["current"])
+            streak["last"] = day
+
+    def _rotate(self, current):
+        old = current - self.max_segments
+        if old >= 0 and os.path.exists(self._segment(old)): os.remove(self._segment(old))
+
+    def _flush(self):
+        tmp = self._path("stats.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(self.stats, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self._path("stats.json"))
+        self.dirty = 0
+
+    def flush(self):
+        with self.lock:
+            if self.dirty: self._flush()
+
+    # --- REPRISE APRÈS ARRÊT ---
+    def _replay_tail(self):
+        # Réponses journalisées après la dernière sauvegarde des agrégats (au plus FLUSH_EVERY en temps normal)
+        for record in self.records(self.stats["logged"]):
+            t, card_id, cat, mode, _, _, _, correct, response_ms = record
+            self._aggregate(card_id, cat, mode, correct, response_ms, t)
+            self.dirty += 1
+        if self.dirty: self._flush()
+
+    def records(self, start=0):
+        # Relit le journal à partir de la réponse n° start (segments supprimés ignorés)
+        n = start
+        while True:
+            path = self._segment(n // self.segment_records)
+            if not os.path.exists(path):
+                if n // self.segment_records < self.stats["logged"] // self.segment_records:
+                    n = (n // self.segment_records + 1) * self.segment_records
+                    continue
+                return
+            with open(path, "rb") as f:
+                f.seek((n % self.segment_records) * RECORD.size)
+                data = f.read()
+            count = len(data) // RECORD.size  # Un enregistrement tronqué (arrêt brutal) est ignoré
+            for t, raw, cat, mode, direction, exercise, session, correct, response_ms in RECORD.iter_unpack(data[:count * RECORD.size]):
+                yield (t, self._card_id(raw), self.categories[cat] if cat < len(self.categories) else "?", MODES[mode] if mode < len(MODES) else "?", DIRECTIONS[direction] if direction < len(DIRECTIONS) else "?", EXERCISES[exercise] if exercise < len(EXERCISES) else "?", SESSIONS[session] if session < len(SESSIONS) else "?", bool(correct), response_ms)
+            n += count
+            if not count or n % self.segment_records: return
+
+    # --- LECTURE DES AGRÉGATS ---
+    def total(self):
+        return self.stats["logged"]
+
+    def retention_by_category(self):
+        return {cat: (ok / n if n else 0.0, n) for cat, (n, ok, _) in self.stats["categories"].items()}
+
+    def response_by_mode(self):
+        return {mode: (ms / n if n else 0.0, ok / n if n else 0.0, n) for mode, (n, ok, ms) in self.stats["modes"].items()}
+
+    def daily(self, days=30, today=None):
+        today = today or date.today()
+        result = []
+        for i in range(days - 1, -1, -1):
+            day = (today - timedelta(days=i)).isoformat()
+            result.append((day, *self.stats["days"].get(day, [0, 0])))
+        return result
+
+    def streak(self, today=None):
+        # Série en cours : perdue si aucune révision ni aujourd'hui ni hier
+        s = self.stats["streak"]
+        today = today or date.today()
+        alive = s["last"] in (today.isoformat(), (today - timedelta(days=1)).isoformat())
+        return (s["current"] if alive else 0), s["best"]
+
+    def hardest(self, k=10, min_answers=2):
+        # Taux d'échec lissé (évite qu'une seule erreur place une carte en tête)
+        rows = ((card_id, n, wrong) for card_id, (n, wrong) in self.stats["cards"].items() if n >= min_answers and wrong)
+        return heapq.nlargest(k, rows, key=lambda r: ((r[2] + 1) / (r[1] + 2), r[2]))
+
+def user_directory(user, root=HISTORY_DIR):
+    return os.path.join(root, re.sub(r"[^\w-]", "_", user))
@@ -0,0 +1,92 @@
+import codecs
+import uuid
+from datetime import datetime
+
+CHUNK_ROWS = 5000
+COLUMNS = ["term_target", "term_primary"]
+
+# --- LECTURE PAR BLOCS (MÉMOIRE BORNÉE) ---
+def _csv_encoding(file, block=1 << 20):
+    # Un CSV enregistré par Excel (Windows) est en cp1252 : on vérifie l'UTF-8 bloc par bloc, sans tout décoder
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while True:
+            data = file.read(block)
+            if isinstance(data, str): return None  # Fichier texte déjà décodé
+            decoder.decode(data, final=not data)
+            if not data: return "utf-8-sig"
+    except UnicodeDecodeError: return "cp1252"
+    finally: file.seek(0)
+
+def _csv_separator(file, encoding):
+    # Les CSV exportés depuis un Excel français utilisent souvent ';'
+    head = file.read(4096)
+    file.seek(0)
+    if isinstance(head, bytes): head = head.decode(encoding, errors="ignore")
+    first_line = head.splitlines()[0] if head else ""
+    sep = ";" if first_line.count(";") > first_line.count(",") else ","
+    return sep, first_line.count(sep) + 1
+
+def _read_csv_chunks(file):
+    import pandas as pd
+    encoding = _csv_encoding(file)
+    sep, columns = _csv_separator(file, encoding or "utf-8")
+    if columns < 2: raise ValueError("le fichier doit contenir deux colonnes (PT, FR)")
+    for chunk in pd.read_csv(file, sep=sep, encoding=encoding, usecols=[0, 1], dtype=str, chunksize=CHUNK_ROWS, skip_blank_lines=True):
+        yield chunk
+
+def _read_xlsx_chunks(file):
+    # openpyxl en lecture seule : les lignes sont lues au fil de l'eau, jamais la feuille entière
+    import pandas as pd
+    from openpyxl import load_workbook
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = []
+        for row in wb.active.iter_rows(min_row=2, max_col=2, values_only=True):
+            rows.append(row)
+            if len(rows) >= CHUNK_ROWS:
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows: yield pd.DataFrame(rows)
+    finally:
+        wb.close()
+
+def read_chunks(file, filename):
+    if filename.lower().endswith(".csv"): return _read_csv_chunks(file)
+    return _read_xlsx_chunks(file)
+
+# --- NETTOYAGE VECTORISÉ ---
+def clean_chunk(chunk):
+    import pandas as pd  # Déjà chargé par la lecture du fichier : pandas n'est importé qu'au premier import
+    df = chunk.iloc[:, :2].copy()
+    if df.shape[1] < 2: return pd.DataFrame(columns=COLUMNS)
+    df.columns = COLUMNS
+    df = df.dropna()
+    for col in COLUMNS: df[col] = df[col].astype(str).str.strip()
+    return df[(df["term_target"] != "") & (df["term_primary"] != "")]
+
+# --- IMPORT ---
+def new_card(target, primary, category, now):
+    return {
+        "id": str(uuid.uuid4()), "category": category,
+        "term_target": target, "term_primary": primary,
+        "srs_data": {"score": 0, "score_apprentissage": 0, "next_review_date": now, "next_review_date_apprentissage": now}
+    }
+
+def import_vocabulary(file, filename, category, existing_targets):
+    # existing_targets : ensemble des term_target déjà présents (complété au fil des blocs)
+    seen = set(existing_targets)
+    now = datetime.now().isoformat()
+    new_cards = []
+    report = {"rows": 0, "added": 0, "skipped_empty": 0, "skipped_duplicate": 0}
+    for chunk in read_chunks(file, filename):
+        report["rows"] += len(chunk)
+        df = clean_chunk(chunk)
+        report["skipped_empty"] += len(chunk) - len(df)
+        df = df.drop_duplicates("term_target")
+        df = df[~df["term_target"].map(seen.__contains__).astype(bool)]
+        seen.update(df["term_target"])
+        new_cards.extend(new_card(target, primary, category, now) for target, primary in zip(df["term_target"], df["term_primary"]))
+    report["added"] = len(new_cards)
+    report["skipped_duplicate"] = report["rows"] - report["skipped_empty"] - report["added"]
+    return new_cards, report
@@ -1,22 +1,39 @@
+import time
+RERUN_START = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import json
 import os
-import uuid
 import random
 import io
-import re
-import unicodedata
 from datetime import datetime, timedelta
-from gtts import gTTS
-import speech_recognition as sr
-from github import Github, Auth # <-- Ajout de Auth ici
+# pandas, gtts, github, speech_recognition et numpy (scheduler) sont importés à la première utilisation :
+# l'écran du PIN et les pages qui n'en ont pas besoin ne paient pas leur chargement
+from storage import resolve_db_path, update_snapshot, read_snapshot, file_lock
+from card_store import CardStore, DUE_KEYS
+from audio_cache import AudioCache
+from importer import import_vocabulary
+from cloud_sync import SyncEngine, GithubBackend, LocalDirBackend
+from bootstrap import load_deck, migrate_db, session_copy
+from distractors import DistractorIndex
+from matching import grade, warm as warm_matching, TYPO, WRONG
+from speech import RecognitionService, make_backend
+from sampler import CardSampler
+from search_index import SearchIndex
+from progress_store import ProgressStore, PROGRESS_PATH, DEFAULT_USER
+from history import ReviewHistory, user_directory
+from packs import export_pack, import_pack, PackError, PACK_SUFFIX
+import metrics
+IMPORT_MS = (time.perf_counter() - RERUN_START) * 1000  # Quasi nul sauf au premier rerun du processus
 
 # --- CONFIGURATION ---
 st.set_page_config(page_title="LingoClone", page_icon="🦉", layout="centered")
+metrics.configure(st.secrets.get("DIAGNOSTICS", False))
+metrics.begin_rerun()
+metrics.observe("startup.imports", IMPORT_MS)
 
 # --- CODE D'ACCÈS (Récupéré depuis les Secrets Streamlit) ---
 ACCESS_PIN = st.secrets.get("MY_PIN", "1234")
+# Déploiement partagé : un PIN par utilisateur, ex. [USERS] "1111" = "alice" ; sinon MY_PIN -> "default"
+USERS = {str(pin): name for pin, name in st.secrets.get("USERS", {}).items()}
 
 # --- INITIALISATION DE L'AUTHENTIFICATION ---
 if "authenticated" not in st.session_state:
@@ -44,8 +61,10 @@ if not st.session_state.authenticated:
     pin_input = st.text_input("Code PIN", type="password", max_chars=4, help="Entrez les 4 chiffres")
     
     if pin_input:
-        if pin_input == str(ACCESS_PIN):
+        user = USERS.get(pin_input) or (DEFAULT_USER if pin_input == str(ACCESS_PIN) else None)
+        if user:
             st.session_state.authenticated = True
+            st.session_state.user = user
             st.success("Accès autorisé ! Chargement...")
             st.rerun()
         elif len(pin_input) == 4:
@@ -75,85 +94,192 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 DB_PATH = "vocab_db.json"
+LIBRARY_PAGE_SIZE = 50
+OFFLINE = bool(st.secrets.get("OFFLINE", False))  # Aucun appel réseau : audio du cache et des packs, pas de cloud
+LOCAL_DB_PATH = resolve_db_path(DB_PATH)  # vocab_db.lingo (format compact) s'il existe, sinon le JSON
 DUOLINGO_GREEN = "#58CC02"
 QUIZLET_BLUE = "#4255FF"
 ORAL_ORANGE = "#FF9600"
 
-# --- UTILITAIRE TEXTE ---
-def normalize_text(text):
-    if not text: return ""
-    text = text.lower()
-    text = ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
-    text = re.sub(r'[^\w\s]', ' ', text)
-    return " ".join(text.split())
-
 # --- LOGIQUE BASE DE DONNÉES (CLOUD & LOCAL) ---
-def load_db():
+@st.cache_resource
+def get_progress_store():
+    # Progression SRS par utilisateur (SQLite, une transaction par réponse), partagée par toutes les sessions
+    return ProgressStore(PROGRESS_PATH)
+
+@st.cache_resource
+def get_sync_engine():
+    # Un seul client GitHub authentifié, réutilisé par toutes les sessions
+    if OFFLINE: return None
     if "GITHUB_TOKEN" in st.secrets and "REPO_NAME" in st.secrets:
-        try:
-            # CORRECTION : Nouvelle méthode d'authentification PyGithub
-            auth = Auth.Token(st.secrets["GITHUB_TOKEN"])
-            g = Github(auth=auth)
-            repo = g.get_repo(st.secrets["REPO_NAME"])
-            file_content = repo.get_contents(DB_PATH)
-            data = json.loads(file_content.decoded_content.decode("utf-8"))
-            if "vocabulary" in data:
-                for c in data["vocabulary"]:
-                    if "category" not in c: c["category"] = "Général"
-                    if "score" not in c["srs_data"]: c["srs_data"]["score"] = c["srs_data"].get("box_level", 0)
-                    if "score_apprentissage" not in c["srs_data"]: c["srs_data"]["score_apprentissage"] = 0
-                    if "next_review_date_apprentissage" not in c["srs_data"]: c["srs_data"]["next_review_date_apprentissage"] = c["srs_data"].get("next_review_date", datetime.now().isoformat())
-            return data
+        from github import Github, Auth
+        # CORRECTION : Nouvelle méthode d'authentification PyGithub
+        auth = Auth.Token(st.secrets["GITHUB_TOKEN"])
+        g = Github(auth=auth)
+        return SyncEngine(GithubBackend(g.get_repo(st.secrets["REPO_NAME"])))
+    if "SYNC_DIR" in st.secrets:
+        # Dossier local jouant le rôle du dépôt distant (tests hors-ligne)
+        return SyncEngine(LocalDirBackend(st.secrets["SYNC_DIR"]))
+    return None
+
+def sync_engine():
+    try: return get_sync_engine()
+    except Exception as e:
+        st.session_state.sync_warning = f"Cloud indisponible : {e}"
+        return None
+
+def progress_sync_engine():
+    # Le cloud ne stocke qu'une progression, celle de "default" : les autres utilisateurs restent en local
+    return sync_engine() if st.session_state.user == DEFAULT_USER else None
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_shared_deck(path, mtime):
+    # Parsé et migré une seule fois pour toutes les sessions ; rechargé si le fichier change (mtime)
+    deck = load_deck(path, DB_PATH)
+    warm_matching(deck["vocabulary"])
+    return deck
+
+@metrics.instrument("load_db")
+def load_db():
+    data, remote = None, {}
+    engine = sync_engine()
+    if engine is not None:
+        try: data, remote = engine.pull()
         except Exception as e:
-            pass 
+            st.session_state.sync_warning = f"Chargement cloud impossible, base locale utilisée ({e})"
     
-    if os.path.exists(DB_PATH):
-        try:
-            with open(DB_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if "vocabulary" in data:
-                    for c in data["vocabulary"]:
-                        if "category" not in c: c["category"] = "Général"
-                        if "score" not in c["srs_data"]: c["srs_data"]["score"] = c["srs_data"].get("box_level", 0)
-                        if "score_apprentissage" not in c["srs_data"]: c["srs_data"]["score_apprentissage"] = 0
-                        if "next_review_date_apprentissage" not in c["srs_data"]: c["srs_data"]["next_review_date_apprentissage"] = c["srs_data"].get("next_review_date", datetime.now().isoformat())
-                return data
-        except:
-            pass
-    return {"vocabulary": []}
-
-def save_db(db):
-    try:
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-            json.dump(db, f, indent=4, ensure_ascii=False)
-    except:
-        pass
+    if data is not None:
+        migrate_db(data)
+        try: reconcile_cards(data)
+        except Exception as e: st.session_state.sync_warning = f"Base locale indisponible ({e})"
+    elif os.path.exists(LOCAL_DB_PATH):
+        try: data = session_copy(load_shared_deck(LOCAL_DB_PATH, os.path.getmtime(LOCAL_DB_PATH)))
+        except: pass
+    if data is None: data = {"vocabulary": []}
+
+    # Progression de l'utilisateur connecté (sauf si une révision plus récente existe en ligne)
+    if st.session_state.user != DEFAULT_USER: remote = {}
+    try: get_progress_store().overlay(data, st.session_state.user, newer_than=remote)
+    except Exception as e: st.session_state.sync_warning = f"Progression indisponible ({e})"
+    return data
+
+def reconcile_cards(data):
+    # Base locale et cloud : chaque côté reçoit les cartes qui lui manquent (imports faits par d'autres
+    # sessions sur ce serveur, ou sur un autre appareil). Le snapshot envoyé au cloud part de la base locale.
+    local = load_shared_deck(LOCAL_DB_PATH, os.path.getmtime(LOCAL_DB_PATH)) if os.path.exists(LOCAL_DB_PATH) else {"vocabulary": []}
+    local_ids = {c["id"] for c in local["vocabulary"]}
+    remote_ids = {c["id"] for c in data["vocabulary"]}
+    data["vocabulary"].extend({**c, "srs_data": c["srs_data"].copy()} for c in local["vocabulary"] if c["id"] not in remote_ids)
+    missing = [c for c in data["vocabulary"] if c["id"] not in local_ids]
+    if missing:
+        def add_missing(disk):
+            on_disk = {c["id"] for c in disk["vocabulary"]}
+            disk["vocabulary"].extend({**c, "srs_data": c["srs_data"].copy()} for c in missing if c["id"] not in on_disk)
+        update_snapshot(LOCAL_DB_PATH, add_missing)
+
+def cloud_snapshot():
+    # Snapshot complet pour le cloud : cartes de la base locale partagée (tous les imports, de toutes les
+    # sessions) et progression de "default" ; SyncEngine y fusionne ensuite la progression distante
+    with file_lock(LOCAL_DB_PATH):
+        db = read_snapshot(LOCAL_DB_PATH) if os.path.exists(LOCAL_DB_PATH) else {"vocabulary": []}
+    migrate_db(db)
+    get_progress_store().overlay(db, DEFAULT_USER)
+    return db
+
+@metrics.instrument("save.vocabulary")
+def update_vocabulary(apply):
+    # Le vocabulaire partagé est relu et réécrit sous verrou : deux imports simultanés ne s'écrasent pas
+    try: update_snapshot(LOCAL_DB_PATH, apply)
+    except: pass
+    engine = sync_engine()
+    if engine is not None:
+        try: engine.mark_full()
+        except: pass
+
+@metrics.instrument("save.review")
+def record_review(card_id, srs_update):
+    # Une réponse = une ligne mise à jour pour cet utilisateur, coût constant quelle que soit la taille du deck
+    t = datetime.now().isoformat()
+    try: get_progress_store().update(st.session_state.user, card_id, srs_update, t)
+    except: pass
+    engine = progress_sync_engine()
+    if engine is not None:
+        try: engine.record(card_id, srs_update, t)
+        except: pass
+
+@metrics.instrument("save.bulk")
+def record_bulk(keys):
+    # Opérations en masse (réinitialisation, changement d'algorithme) : un seul lot transactionnel
+    updates = {c["id"]: {k: c["srs_data"][k] for k in keys if k in c["srs_data"]} for c in st.session_state.db["vocabulary"]}
+    t = datetime.now().isoformat()
+    try: get_progress_store().update_many(st.session_state.user, updates, t)
+    except: pass
+    engine = progress_sync_engine()
+    if engine is not None:
+        try: engine.record_many(updates, t)
+        except: pass
+
+@st.cache_resource
+def get_history(user):
+    # Un historique par utilisateur, partagé par ses sessions (le verrou interne sérialise les ajouts)
+    return ReviewHistory(user_directory(user))
+
+def log_answer(card, success):
+    # Chaque réponse est ajoutée à l'historique : les statistiques se lisent ensuite dans les agrégats
+    page = st.session_state.get("active_page", "")
+    exercise = "flashcard" if page == "Apprentissage (Quizlet)" else "oral" if page == "Expression Orale 🎙️" else st.session_state.ex_type
+    direction = "pt-fr" if st.session_state.current_question == card["term_target"] else "fr-pt"
+    start = st.session_state.get("question_start")
+    answered = st.session_state.get("answered_at") or time.time()
+    try: get_history(st.session_state.user).record(card["id"], card.get("category", "Général"), page, direction, exercise, st.session_state.session_mode, success, (answered - start) * 1000 if start else 0)
+    except: pass
 
 # --- GÉNÉRATION AUDIO ---
-def get_audio_bytes(text, lang='pt', tld='pt'):
+def synthesize_audio(text, lang='pt', tld='pt'):
     try:
+        start = time.perf_counter()
+        from gtts import gTTS
         tts = gTTS(text=text, lang=lang, tld=tld)
         fp = io.BytesIO()
         tts.write_to_fp(fp)
+        metrics.observe("audio.synthesize", (time.perf_counter() - start) * 1000, fp.tell())
         return fp.getvalue()
     except: return None
 
+@st.cache_resource
+def get_audio_cache():
+    # Cache partagé entre sessions : mémoire + disque (audio_cache/), éviction LRU
+    return AudioCache(synthesize_audio, offline=OFFLINE)
+
+@metrics.instrument("audio.get")
+def get_audio_bytes(text, lang='pt', tld='pt'):
+    try: return get_audio_cache().get(text, lang, tld)
+    except: return None
+
+def prefetch_audio(cards):
+    # Synthèse en arrière-plan des cartes à venir pendant que l'apprenant répond
+    try: return get_audio_cache().prefetch([(c["term_target"], 'pt', 'pt') for c in cards])
+    except: return []
+
 # --- RECONNAISSANCE VOCALE ---
-def recognize_speech_from_audio(audio_file_bytes):
-    r = sr.Recognizer()
-    try:
-        with sr.AudioFile(audio_file_bytes) as source:
-            audio_data = r.record(source)
-            return r.recognize_google(audio_data, language='pt-PT')
-    except: return "[Incompréhensible]"
+@st.cache_resource
+def get_speech_service():
+    # Pool de workers partagé ; moteur choisi par le secret SPEECH_BACKEND : "google" (défaut), "local" ou "stub"
+    return RecognitionService(make_backend(st.secrets.get("SPEECH_BACKEND", "google")))
 
 # --- INITIALISATION STATE GLOBALE ---
+if "user" not in st.session_state: st.session_state.user = DEFAULT_USER
 if "db" not in st.session_state: st.session_state.db = load_db()
+if "store" not in st.session_state:
+    st.session_state.store = CardStore(st.session_state.db)
+    st.session_state.boot_ms = (time.perf_counter() - RERUN_START) * 1000  # Temps jusqu'au premier rendu
+    st.session_state.import_ms = IMPORT_MS
 if "play_queue" not in st.session_state: st.session_state.play_queue = []
 if "current_step" not in st.session_state: st.session_state.current_step = 0
 if "exercise_initialized" not in st.session_state: st.session_state.exercise_initialized = False
 if "answer_checked" not in st.session_state: st.session_state.answer_checked = False
 if "is_correct" not in st.session_state: st.session_state.is_correct = False
+if "verdict" not in st.session_state: st.session_state.verdict = None
 if "user_input_val" not in st.session_state: st.session_state.user_input_val = ""
 if "is_flipped" not in st.session_state: st.session_state.is_flipped = False
 if "has_failed" not in st.session_state: st.session_state.has_failed = False
@@ -164,7 +290,7 @@ if "options" not in st.session_state: st.session_state.options = []
 if "pt_audio" not in st.session_state: st.session_state.pt_audio = None
 
 # Filtres par défaut
-ALL_CATEGORIES = sorted(list(set([c.get("category", "Général") for c in st.session_state.db["vocabulary"]])))
+ALL_CATEGORIES = st.session_state.store.categories()
 if "multiselect_cats" not in st.session_state: st.session_state.multiselect_cats = ALL_CATEGORIES
 if "nb_mots_limit" not in st.session_state: st.session_state.nb_mots_limit = 20
 if "direction_choice" not in st.session_state: st.session_state.direction_choice = "Aléatoire"
@@ -172,18 +298,52 @@ if "exo_choice" not in st.session_state: st.session_state.exo_choice = "Mixte"
 if "active_direction" not in st.session_state: st.session_state.active_direction = "Aléatoire"
 if "active_exo" not in st.session_state: st.session_state.active_exo = "Mixte"
 if "session_mode" not in st.session_state: st.session_state.session_mode = "srs"
+if "hard_distractors" not in st.session_state: st.session_state.hard_distractors = False
+if "active_hard" not in st.session_state: st.session_state.active_hard = False
 
 # --- FONCTIONS DE GESTION ---
+def current_algorithm():
+    from scheduler import ALGORITHMS, DEFAULT_ALGORITHM
+    return ALGORITHMS[st.session_state.db.get("settings", {}).get("srs_algorithm", DEFAULT_ALGORITHM)]
+
+def get_distractors():
+    # Construit à la première question QCM, puis complété à chaque import
+    if "distractors" not in st.session_state: st.session_state.distractors = DistractorIndex(st.session_state.db["vocabulary"])
+    return st.session_state.distractors
+
+def get_search_index():
+    # Construit à la première visite de la Bibliothèque, puis complété à chaque import
+    if "search_index" not in st.session_state: st.session_state.search_index = SearchIndex(st.session_state.db["vocabulary"])
+    return st.session_state.search_index
+
+def add_cards(new_cards):
+    # Nouvelles cartes (import Excel/CSV ou pack) : deck de la session, index, puis base partagée
+    st.session_state.store.add(new_cards)
+    if "distractors" in st.session_state: st.session_state.distractors.add(new_cards)
+    if "search_index" in st.session_state: st.session_state.search_index.add(new_cards)
+    warm_matching(new_cards)
+    def add_new(disk):
+        # Dédoublonnage contre la base sur disque : une autre session a pu importer entre-temps
+        on_disk = {c["term_target"] for c in disk["vocabulary"]}
+        disk["vocabulary"].extend(c for c in new_cards if c["term_target"] not in on_disk)
+    update_vocabulary(add_new)
+
+def reset_library_page(): st.session_state.library_page = 1
+
 def select_all_cats(): st.session_state.multiselect_cats = ALL_CATEGORIES
 def deselect_all_cats(): st.session_state.multiselect_cats = []
 
 def reset_exercise_state():
     st.session_state.exercise_initialized = False
+    st.session_state.pop("answered_at", None)
     st.session_state.answer_checked = False
     st.session_state.is_flipped = False
     st.session_state.user_input_val = ""
     st.session_state.has_failed = False
     st.session_state.retry_counter = 0
+    st.session_state.verdict = None
+    st.session_state.pop("speech_timings", None)
+    st.session_state.pop("speech_job", None)
 
 def set_dont_know():
     st.session_state.is_correct = False
@@ -198,48 +358,58 @@ def retry_oral():
 
 def quit_session():
     st.session_state.play_queue = []
+    st.session_state.pop("sampler", None)
     st.session_state.current_step = 0
     reset_exercise_state()
 
 def generate_session(mode_type, current_mode):
     st.session_state.session_mode = mode_type
+    st.session_state.active_page = current_mode
     st.session_state.active_direction = st.session_state.direction_choice
     st.session_state.active_exo = st.session_state.exo_choice
+    st.session_state.active_hard = st.session_state.hard_distractors
+    if st.session_state.active_hard and current_mode == "Entraînement (Quiz)": get_distractors().warm(st.session_state.multiselect_cats)
     
-    all_cards = st.session_state.db["vocabulary"]
-    valid_cards = [c for c in all_cards if c.get("category", "Général") in st.session_state.multiselect_cats]
-    
+    store = st.session_state.store
+    key = "next_review_date_apprentissage" if current_mode == "Apprentissage (Quizlet)" else "next_review_date"
+    st.session_state.pop("sampler", None)
     if mode_type == "srs":
-        now = datetime.now()
-        key = "next_review_date_apprentissage" if current_mode == "Apprentissage (Quizlet)" else "next_review_date"
-        valid_cards = [c for c in valid_cards if now >= datetime.fromisoformat(c["srs_data"].get(key, now.isoformat()))]
-    
-    if not valid_cards: return
-    random.shuffle(valid_cards)
-    
-    st.session_state.play_queue = [random.choice(valid_cards)] if mode_type == "infini" else valid_cards[:st.session_state.nb_mots_limit]
+        valid_cards = store.due_cards(key, st.session_state.multiselect_cats)
+        if not valid_cards: return
+        random.shuffle(valid_cards)
+        st.session_state.play_queue = valid_cards[:st.session_state.nb_mots_limit]
+    else:
+        # Tirage pondéré (mots ratés et en retard d'abord), construit une fois pour la session
+        sampler = CardSampler(store.cards(st.session_state.multiselect_cats), key, store.due_timestamps(key))
+        if not len(sampler): return
+        if mode_type == "infini":
+            st.session_state.sampler = sampler
+            st.session_state.play_queue = [sampler.draw()]
+        else:
+            st.session_state.play_queue = sampler.take(st.session_state.nb_mots_limit)
+    prefetch_audio(st.session_state.play_queue)
     st.session_state.current_step = 0
     reset_exercise_state()
 
 def next_question(card_id, success, current_mode):
-    db = st.session_state.db
-    for card in db["vocabulary"]:
-        if card["id"] == card_id:
-            s_key = "score_apprentissage" if current_mode == "Apprentissage (Quizlet)" else "score"
-            d_key = "next_review_date_apprentissage" if current_mode == "Apprentissage (Quizlet)" else "next_review_date"
-            
-            card["srs_data"][s_key] = card["srs_data"].get(s_key, 0) + (1 if success else -1)
-            score = card["srs_data"][s_key]
-            
-            # Algorithme de répétition espacée
-            days = {0:0, 1:1, 2:3, 3:7, 4:14}.get(score, 30 if score > 0 else 0)
-            card["srs_data"][d_key] = (datetime.now() + timedelta(days=days)).isoformat()
-            break
-    save_db(db)
+    store = st.session_state.store
+    card = store.get(card_id)
+    if card is not None:
+        d_key = "next_review_date_apprentissage" if current_mode == "Apprentissage (Quizlet)" else "next_review_date"
+        
+        # Algorithme de répétition espacée (choisi dans les Paramètres)
+        from scheduler import review_card
+        update = review_card(current_algorithm(), card["srs_data"], d_key, success)
+        card["srs_data"].update(update)
+        store.update_due(card_id, d_key)
+        record_review(card_id, update)
+        log_answer(card, success)
     
-    if st.session_state.session_mode == "infini":
-        valid = [c for c in db["vocabulary"] if c.get("category", "Général") in st.session_state.multiselect_cats]
-        if valid: st.session_state.play_queue.append(random.choice(valid))
+    if st.session_state.session_mode == "infini" and "sampler" in st.session_state:
+        sampler = st.session_state.sampler
+        if card is not None: sampler.update(card_id, store.due_timestamps(d_key)[card_id])
+        st.session_state.play_queue.append(sampler.draw())
+        prefetch_audio(st.session_state.play_queue[-1:])
         
     st.session_state.current_step += 1
     reset_exercise_state()
@@ -248,66 +418,148 @@ def next_question(card_id, success, current_mode):
 st.sidebar.title("🦉 LingoClone")
 
 # Bouton de sauvegarde Cloud (Seulement si GitHub configuré)
-if "GITHUB_TOKEN" in st.secrets and "REPO_NAME" in st.secrets:
+if "sync_warning" in st.session_state: st.sidebar.warning(st.session_state.pop("sync_warning"))
+if progress_sync_engine() is not None:
     # CORRECTION : Remplacement de use_container_width par width="stretch"
     if st.sidebar.button("☁️ Sauvegarder ma progression", type="primary", width="stretch"):
         try:
             with st.spinner("Sauvegarde sur le cloud en cours..."):
-                # CORRECTION : Nouvelle méthode d'authentification PyGithub
-                auth = Auth.Token(st.secrets["GITHUB_TOKEN"])
-                g = Github(auth=auth)
-                repo = g.get_repo(st.secrets["REPO_NAME"])
-                try:
-                    contents = repo.get_contents(DB_PATH)
-                    repo.update_file(contents.path, "Mise à jour progression LingoClone", json.dumps(st.session_state.db, indent=4, ensure_ascii=False), contents.sha)
-                except:
-                    repo.create_file(DB_PATH, "Création base de données", json.dumps(st.session_state.db, indent=4, ensure_ascii=False))
-            st.sidebar.success("Progression sauvegardée ! ✅")
+                # Seules les révisions faites depuis le dernier envoi partent, en un seul commit
+                stats = progress_sync_engine().push(cloud_snapshot())
+            st.sidebar.success(f"Progression sauvegardée ! ✅ ({stats['cards']} cartes mises à jour)")
         except Exception as e:
             st.sidebar.error("Erreur de sauvegarde. Vérifiez vos clés GitHub.")
 
+if get_audio_cache().offline: st.sidebar.caption("📴 Hors-ligne : seuls les sons déjà générés ou importés par pack sont disponibles.")
+
 st.sidebar.divider()
-menu = st.sidebar.radio("Navigation", ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Orale 🎙️", "Dictionnaires 📖", "Bibliothèque", "Paramètres"])
+menu = st.sidebar.radio("Navigation", ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Orale 🎙️", "Dictionnaires 📖", "Bibliothèque", "Statistiques 📊", "Paramètres"])
 
 if menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Orale 🎙️"] and len(st.session_state.play_queue) > 0 and st.session_state.current_step < len(st.session_state.play_queue):
     st.sidebar.divider()
     st.sidebar.button("🛑 Quitter la session", on_click=quit_session, width="stretch", type="primary")
 
 # --- PAGES ---
+page_timer = metrics.start("page." + menu)
 if menu == "Paramètres":
+    import pandas as pd
+    from scheduler import ALGORITHMS, SrsColumns
     st.header("⚙️ Configuration")
     list_name = st.text_input("Nom de la liste / Catégorie", value="Général")
-    uploaded_file = st.file_uploader("Importer Excel (Col 1: PT, Col 2: FR)", type=["xlsx"])
+    uploaded_file = st.file_uploader("Importer Excel ou CSV (Col 1: PT, Col 2: FR)", type=["xlsx", "csv"])
     
-    if uploaded_file:
-        df = pd.read_excel(uploaded_file)
-        added = 0
-        for _, row in df.iterrows():
-            if not pd.isna(row.iloc[0]) and not pd.isna(row.iloc[1]):
-                target_word = str(row.iloc[0]).strip()
-                primary_word = str(row.iloc[1]).strip()
-                if target_word and primary_word and not any(i['term_target'] == target_word for i in st.session_state.db["vocabulary"]):
-                    st.session_state.db["vocabulary"].append({
-                        "id": str(uuid.uuid4()), "category": list_name.strip(), 
-                        "term_target": target_word, "term_primary": primary_word, 
-                        "srs_data": {"score": 0, "score_apprentissage": 0, "next_review_date": datetime.now().isoformat(), "next_review_date_apprentissage": datetime.now().isoformat()}
-                    })
-                    added += 1
-        save_db(st.session_state.db)
-        st.success(f"✅ {added} mots importés dans '{list_name}' !")
-        st.rerun()
+    if "imported_files" not in st.session_state: st.session_state.imported_files = set()
+    if uploaded_file and uploaded_file.file_id not in st.session_state.imported_files:
+        existing = {c["term_target"] for c in st.session_state.db["vocabulary"]}
+        st.session_state.imported_files.add(uploaded_file.file_id)
+        try: new_cards, report = import_vocabulary(uploaded_file, uploaded_file.name, list_name.strip(), existing)
+        except Exception as e: st.error(f"Import impossible : {e}")
+        else:
+            add_cards(new_cards)
+            st.session_state.import_report = (list_name, report)
+            st.rerun()
+    if "import_report" in st.session_state:
+        name, report = st.session_state.pop("import_report")
+        st.success(f"✅ {report['added']} mots importés dans '{name}' !")
+        if report["skipped_duplicate"] or report["skipped_empty"]:
+            st.caption(f"{report['skipped_duplicate']} doublons et {report['skipped_empty']} lignes incomplètes ignorés.")
+
+    st.divider()
+    st.markdown("**🎧 Audio hors-ligne**")
+    audio_cats = st.multiselect("Listes à pré-générer", options=ALL_CATEGORIES, default=ALL_CATEGORIES)
+    if st.button("🎧 Pré-générer l'audio de ces listes"):
+        futures = prefetch_audio(st.session_state.store.cards(audio_cats))
+        bar = st.progress(0.0)
+        for i, f in enumerate(futures):
+            try: f.result()
+            except: pass
+            bar.progress((i + 1) / len(futures))
+        st.success(f"✅ Audio prêt ({len(futures)} nouveaux fichiers générés).")
+
+    st.divider()
+    st.markdown("**📦 Packs hors-ligne**")
+    st.caption("Une liste et tous ses sons dans un seul fichier : révisable sans connexion, sans aucune synthèse vocale.")
+    pack_col1, pack_col2 = st.columns(2)
+    with pack_col1:
+        pack_cat = st.selectbox("Liste à exporter", options=ALL_CATEGORIES)
+        if pack_cat and st.button("📦 Préparer le pack", width="stretch"):
+            bar = st.progress(0.0)
+            data, report = export_pack(st.session_state.store.cards([pack_cat]), get_audio_cache(), pack_cat, bar.progress)
+            st.session_state.pack_export = (pack_cat, data, report)
+        if "pack_export" in st.session_state:
+            name, data, report = st.session_state.pack_export
+            st.download_button(f"⬇️ {name}{PACK_SUFFIX}", data, file_name=name.replace("/", "-") + PACK_SUFFIX, mime="application/zip", width="stretch")
+            if report["missing_audio"]: st.caption(f"⚠️ {report['missing_audio']} mots sans audio (synthèse impossible pendant l'export).")
+    with pack_col2:
+        pack_file = st.file_uploader("Importer un pack", type=[PACK_SUFFIX[1:]], key="pack_upload")
+        if pack_file and pack_file.file_id not in st.session_state.imported_files:
+            try:
+                new_cards, report = import_pack(pack_file, get_audio_cache(), {c["term_target"] for c in st.session_state.db["vocabulary"]})
+                add_cards(new_cards)
+                st.session_state.pack_report = report
+            except PackError as e:
+                st.session_state.pack_report = {"error": str(e)}
+            st.session_state.imported_files.add(pack_file.file_id)
+            st.rerun()
+        if "pack_report" in st.session_state:
+            report = st.session_state.pop("pack_report")
+            if "error" in report: st.error(f"Pack refusé : {report['error']}")
+            else: st.success(f"✅ {report['added']} mots et {report['audio']} sons importés ({report['skipped_duplicate']} déjà présents).")
+
+    st.divider()
+    if "boot_ms" in st.session_state: st.caption(f"⏱️ Démarrage de la session : {st.session_state.boot_ms:.0f} ms (dont imports : {st.session_state.get('import_ms', 0):.0f} ms)")
+    st.markdown("**🧮 Répétition espacée**")
+    algo = current_algorithm()
+    labels = [a.label for a in ALGORITHMS.values()]
+    choice = st.selectbox("Algorithme", labels, index=labels.index(algo.label))
+    new_algo = next(a for a in ALGORITHMS.values() if a.label == choice)
+    if new_algo is not algo:
+        # Replanification de tout le deck en une passe vectorisée
+        store = st.session_state.store
+        for d_key in DUE_KEYS: SrsColumns(st.session_state.db["vocabulary"], d_key, store.due_timestamps(d_key)).reschedule(algo, new_algo)
+        st.session_state.db.setdefault("settings", {})["srs_algorithm"] = new_algo.name
+        try: get_progress_store().set_setting(st.session_state.user, "srs_algorithm", new_algo.name)
+        except: pass
+        store.rebuild()
+        record_bulk([f + sfx for sfx in ("", "_apprentissage") for f in ("next_review_date",) + new_algo.fields])
+        quit_session()
+        st.success(f"Révisions replanifiées avec {new_algo.label} !")
+    if st.session_state.db["vocabulary"]:
+        forecast = st.session_state.store.due_counts("next_review_date", ALL_CATEGORIES, 14)
+        st.caption("📅 Révisions Quiz prévues sur 14 jours")
+        st.bar_chart(pd.DataFrame({"Cartes": forecast}, index=[(datetime.now() + timedelta(days=i)).strftime("%m-%d") for i in range(14)]))
 
     st.divider()
     if st.button("🔄 Forcer une révision (Tout réinitialiser à maintenant)"):
-        for c in st.session_state.db["vocabulary"]:
-            c["srs_data"]["next_review_date"] = datetime.now().isoformat()
-            c["srs_data"]["next_review_date_apprentissage"] = datetime.now().isoformat()
-        save_db(st.session_state.db)
+        for d_key in DUE_KEYS: SrsColumns(st.session_state.db["vocabulary"], d_key, st.session_state.store.due_timestamps(d_key)).reset()
+        st.session_state.store.rebuild()
+        record_bulk(DUE_KEYS)
         quit_session()
         st.success("Dates réinitialisées !")
 
     if st.button("🗑️ Vider TOUTE la base de données", type="secondary"): 
-        st.session_state.db = {"vocabulary": []}; save_db(st.session_state.db); st.rerun()
+        st.session_state.db = {"vocabulary": []}; st.session_state.store = CardStore(st.session_state.db); st.session_state.pop("distractors", None); st.session_state.pop("search_index", None)
+        update_vocabulary(lambda disk: disk["vocabulary"].clear())
+        try: get_progress_store().clear()
+        except: pass
+        st.rerun()
+
+    # Panneau caché : visible avec ?diagnostics=1 dans l'URL, ou si les mesures sont activées (secret DIAGNOSTICS)
+    if metrics.enabled or st.query_params.get("diagnostics"):
+        with st.expander("🩺 Diagnostics"):
+            metrics.set_enabled(st.toggle("Activer les mesures", value=metrics.enabled))
+            data = metrics.snapshot()
+            if data["ops"]:
+                st.markdown("**Par opération**")
+                st.dataframe(pd.DataFrame.from_dict(data["ops"], orient="index"), width="stretch")
+            if data["reruns"]:
+                st.markdown("**Derniers reruns**")
+                st.dataframe(pd.DataFrame([{"Heure": r["time"], "Page": r["page"], "Total (ms)": r["total_ms"], **r["ops"]} for r in reversed(data["reruns"])]), width="stretch", hide_index=True)
+            c1, c2 = st.columns(2)
+            if c1.button("💾 Exporter vers metrics.json", width="stretch"):
+                try: st.success(f"Mesures exportées dans {metrics.export()}")
+                except Exception as e: st.error(f"Export impossible ({e})")
+            if c2.button("♻️ Remettre à zéro", width="stretch"): metrics.reset(); st.rerun()
 
 elif menu == "Dictionnaires 📖":
     st.header("📖 Dictionnaires en ligne")
@@ -316,12 +568,72 @@ elif menu == "Dictionnaires 📖":
     st.link_button("🌐 Ouvrir Lexilogos (Français ↔️ Portugais)", "https://www.lexilogos.com/frances_lingua_dicionario.htm", width="stretch")
 
 elif menu == "Bibliothèque":
+    import pandas as pd
     st.header("📚 Liste de mots")
     if st.session_state.db["vocabulary"]:
-        st.dataframe(pd.DataFrame([{"Liste": c.get("category", "Général"), "Portugais": c["term_target"], "Français": c["term_primary"], "Score Quiz": c["srs_data"].get("score", 0)} for c in st.session_state.db["vocabulary"]]), use_container_width=True) # use_container_width est encore valide pour st.dataframe
+        index = get_search_index()
+        query = st.text_input("🔍 Rechercher (portugais ou français, sans accents)", key="library_query", on_change=reset_library_page)
+        f1, f2 = st.columns(2)
+        lib_cats = f1.multiselect("Listes", options=ALL_CATEGORIES, key="library_cats", placeholder="Toutes les listes", on_change=reset_library_page)
+        lo, hi = index.score_min, max(index.score_max, index.score_min + 1)
+        score_sel = f2.slider("Score Quiz", lo, hi, (lo, hi), key="library_scores", on_change=reset_library_page)
+        # Les bornes du curseur valent "sans limite" (les scores évoluent pendant la session)
+        score_range = (None if score_sel[0] == lo else score_sel[0], None if score_sel[1] == hi else score_sel[1])
+
+        if "library_page" not in st.session_state: st.session_state.library_page = 1
+        page = st.session_state.library_page
+        total, hits = index.search(query, lib_cats or None, score_range, page - 1, LIBRARY_PAGE_SIZE)
+        pages = max(1, -(-total // LIBRARY_PAGE_SIZE))
+        if page > pages:
+            st.session_state.library_page = page = pages
+            total, hits = index.search(query, lib_cats or None, score_range, page - 1, LIBRARY_PAGE_SIZE)
+        if hits: st.dataframe(pd.DataFrame([{"Liste": c.get("category", "Général"), "Portugais": c["term_target"], "Français": c["term_primary"], "Score Quiz": c["srs_data"].get("score", 0)} for c in hits]), width="stretch", hide_index=True)
+        else: st.info("Aucun mot ne correspond à cette recherche.")
+        p1, p2 = st.columns([1, 3])
+        p1.number_input("Page", min_value=1, max_value=pages, key="library_page")
+        p2.caption(f"{total} mots — page {page} / {pages}")
     else:
         st.info("Votre bibliothèque est vide.")
 
+elif menu == "Statistiques 📊":
+    import pandas as pd
+    st.header("📊 Statistiques")
+    # Tout est lu dans les agrégats tenus à jour à chaque réponse : l'historique n'est jamais relu ici
+    hist = get_history(st.session_state.user)
+    if hist.total():
+        days = hist.daily(30)
+        current, best = hist.streak()
+        done, ok = sum(d[1] for d in days), sum(d[2] for d in days)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Révisions", hist.total())
+        c2.metric("Aujourd'hui", days[-1][1])
+        c3.metric("Série", f"{current} j", help=f"Record : {best} jours")
+        c4.metric("Réussite (30 j)", f"{ok / done:.0%}" if done else "—")
+        st.caption("📆 Révisions des 30 derniers jours")
+        st.bar_chart(pd.DataFrame({"Réussies": [d[2] for d in days], "Ratées": [d[1] - d[2] for d in days]}, index=[d[0][5:] for d in days]))
+
+        col_cat, col_mode = st.columns(2)
+        with col_cat:
+            st.markdown("**🎯 Rétention par liste**")
+            retention = hist.retention_by_category()
+            st.dataframe(pd.DataFrame([{"Liste": cat, "Réussite": f"{r:.0%}", "Réponses": n} for cat, (r, n) in sorted(retention.items())]), hide_index=True, width="stretch")
+        with col_mode:
+            st.markdown("**⏱️ Par mode**")
+            st.dataframe(pd.DataFrame([{"Mode": mode, "Temps moyen": f"{ms / 1000:.1f} s", "Réussite": f"{r:.0%}", "Réponses": n} for mode, (ms, r, n) in hist.response_by_mode().items()]), hide_index=True, width="stretch")
+
+        hard = [(st.session_state.store.get(card_id), n, wrong) for card_id, n, wrong in hist.hardest(10)]
+        hard = [(c, n, wrong) for c, n, wrong in hard if c is not None]
+        if hard:
+            st.markdown("**🧱 Mots les plus difficiles**")
+            st.dataframe(pd.DataFrame([{"Portugais": c["term_target"], "Français": c["term_primary"], "Liste": c.get("category", "Général"), "Erreurs": wrong, "Réponses": n} for c, n, wrong in hard]), hide_index=True, width="stretch")
+    else:
+        st.info("Aucune révision enregistrée pour l'instant : les statistiques apparaîtront après vos premières réponses.")
+
+    if st.session_state.db["vocabulary"]:
+        st.markdown("**📅 Charge de révision à venir (Quiz)**")
+        load = st.session_state.store.due_counts("next_review_date", ALL_CATEGORIES, 14)
+        st.bar_chart(pd.DataFrame({"Cartes": load}, index=[(datetime.now() + timedelta(days=i)).strftime("%m-%d") for i in range(14)]))
+
 elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Orale 🎙️"]:
     
     if len(st.session_state.play_queue) == 0 or st.session_state.current_step >= len(st.session_state.play_queue):
@@ -335,7 +647,7 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
                 btn_col2.button("Tout décocher", on_click=deselect_all_cats, width="stretch")
                 st.multiselect("Sélection", options=ALL_CATEGORIES, key="multiselect_cats", label_visibility="collapsed")
                 
-                valid_count = len([c for c in st.session_state.db["vocabulary"] if c.get("category", "Général") in st.session_state.multiselect_cats])
+                valid_count = st.session_state.store.count(st.session_state.multiselect_cats)
                 if st.session_state.nb_mots_limit > max(1, valid_count): st.session_state.nb_mots_limit = max(1, valid_count)
                 st.number_input(f"🔢 Limite de mots (Mode Libre)", min_value=1, max_value=max(1, valid_count), key="nb_mots_limit")
             
@@ -347,6 +659,7 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
                     st.radio("🔄 Sens", ["Aléatoire", "Français ➡️ Portugais", "Portugais ➡️ Français"], key="direction_choice")
                 if menu == "Entraînement (Quiz)":
                     st.radio("📝 Type", ["Mixte", "Quiz Écrit", "QCM"], key="exo_choice")
+                    st.checkbox("🧠 Distracteurs difficiles (QCM)", key="hard_distractors", help="Propose des mots proches de la bonne réponse")
         
         st.divider()
         if not st.session_state.multiselect_cats: st.warning("⚠️ Sélectionnez au moins une liste.")
@@ -371,11 +684,17 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
             else: st.session_state.ex_type = "qcm"
 
             if st.session_state.ex_type == "qcm" and menu == "Entraînement (Quiz)":
-                others = [c["term_primary"] if show_pt else c["term_target"] for c in st.session_state.db["vocabulary"] if c.get("category", "Général") in st.session_state.multiselect_cats and c["id"] != card["id"]]
-                st.session_state.options = random.sample(others, min(len(others), 3)) + [st.session_state.current_answer]
+                field = "term_primary" if show_pt else "term_target"
+                answer = st.session_state.current_answer
+                others = get_distractors().hard(card.get("category", "Général"), field, answer) if st.session_state.active_hard else []
+                if len(others) < 3: others += [o for o in get_distractors().sample(st.session_state.multiselect_cats, field, answer, 3 + len(others)) if o not in others][:3 - len(others)]
+                st.session_state.options = others + [answer]
                 random.shuffle(st.session_state.options)
 
             st.session_state.exercise_initialized = True
+            st.session_state.question_start = time.time()
+        # Temps de réponse : arrêté au premier rerun où la réponse est validée
+        if st.session_state.answer_checked and "answered_at" not in st.session_state: st.session_state.answered_at = time.time()
 
         score_disp = card['srs_data'].get('score_apprentissage', 0) if menu == "Apprentissage (Quizlet)" else card['srs_data'].get('score', 0)
         
@@ -419,7 +738,8 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
                     with c1:
                         if st.button("VÉRIFIER", width="stretch", type="primary"):
                             if user_t:
-                                is_cor = (normalize_text(user_t) == normalize_text(st.session_state.current_answer))
+                                st.session_state.verdict = grade(user_t, st.session_state.current_answer)
+                                is_cor = st.session_state.verdict != WRONG
                                 st.session_state.is_correct = is_cor
                                 if not is_cor: st.session_state.has_failed = True
                                 st.session_state.user_input_val = user_t; st.session_state.answer_checked = True; st.rerun()
@@ -429,10 +749,11 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
             else:
                 if st.session_state.is_correct:
                     st.success(f"### 🎉 Correct !\nLa réponse est bien : **{st.session_state.current_answer}**")
+                    if st.session_state.verdict == TYPO: st.warning(f"✏️ Attention à l'orthographe : vous avez écrit *{st.session_state.user_input_val}*")
                     if card["term_target"] == st.session_state.current_answer and st.session_state.pt_audio: st.audio(st.session_state.pt_audio)
                     st.button("CONTINUER", on_click=next_question, args=(card["id"], not st.session_state.has_failed, menu), type="primary", width="stretch")
                 else:
-                    if st.session_state.user_input_val == "[Je ne sais pas]": st.info(f"### 💡 Réponse :\nLa traduction de **{question}** est : **{st.session_state.current_answer}**")
+                    if st.session_state.user_input_val == "[Je ne sais pas]": st.info(f"### 💡 Réponse :\nLa traduction de **{st.session_state.current_question}** est : **{st.session_state.current_answer}**")
                     else: st.error(f"### ❌ Oups !\nVous avez répondu : *{st.session_state.user_input_val}*\nBonne réponse : **{st.session_state.current_answer}**")
                     if card["term_target"] == st.session_state.current_answer and st.session_state.pt_audio: st.audio(st.session_state.pt_audio)
                     st.button("CONTINUER", on_click=next_question, args=(card["id"], False, menu), type="primary", width="stretch")
@@ -441,21 +762,45 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
             st.markdown(f'<div class="question-card" style="background-color:#f8f9fa; border-radius:15px; border-left:10px solid {ORAL_ORANGE}; margin-bottom:20px;"><p style="color:#666; margin:0; font-weight:bold;">Traduisez à voix haute :</p><h2 class="question-title" style="margin:0; color:#333;">{st.session_state.current_question}</h2></div>', unsafe_allow_html=True)
             if not st.session_state.answer_checked:
                 audio_v = st.audio_input("Parlez ici", key=f"mic_{st.session_state.current_step}_{st.session_state.retry_counter}")
+                waiting = False
+                try: service = get_speech_service()
+                except RuntimeError as e:
+                    st.error(f"Reconnaissance vocale indisponible : {e}")
+                    audio_v = None
                 if audio_v:
-                    with st.spinner("Analyse..."):
-                        txt = recognize_speech_from_audio(audio_v)
+                    # La reconnaissance tourne dans un worker : l'interface reste utilisable pendant l'analyse
+                    job = st.session_state.get("speech_job")
+                    if job is None or job["audio_id"] != audio_v.file_id:
+                        job = st.session_state.speech_job = {"audio_id": audio_v.file_id, "future": service.submit(audio_v.getvalue()), "start": time.perf_counter()}
+                    if not job["future"].done():
+                        if time.perf_counter() - job["start"] > service.timeout:
+                            st.error("La reconnaissance a pris trop de temps. Répétez ?")
+                        else:
+                            st.info("🎧 Analyse...")
+                            waiting = True
+                    else:
+                        result = job["future"].result()
+                        txt = result["text"]
                         if not txt or txt.startswith("["): st.error(f"Mal entendu ({txt}). Répétez ?")
                         else:
+                            start = time.perf_counter()
                             st.session_state.user_input_val = txt
-                            is_cor = (normalize_text(txt) == normalize_text(st.session_state.current_answer))
+                            st.session_state.verdict = grade(txt, st.session_state.current_answer)
+                            is_cor = st.session_state.verdict != WRONG
                             st.session_state.is_correct = is_cor
                             if not is_cor: st.session_state.has_failed = True
+                            st.session_state.speech_timings = {**result["timings"], "grade_ms": (time.perf_counter() - start) * 1000}
                             st.session_state.answer_checked = True; st.rerun()
                 st.markdown("<br>", unsafe_allow_html=True)
                 if st.button("🤷 Je ne sais pas", width="stretch"): set_dont_know(); st.rerun()
+                if waiting: time.sleep(0.2); st.rerun()
             else:
+                if "speech_timings" in st.session_state:
+                    t = st.session_state.speech_timings
+                    st.caption(f"⏱️ Décodage {t.get('decode_ms', 0):.0f} ms · Reconnaissance {t.get('recognize_ms', 0):.0f} ms · Correction {t.get('grade_ms', 0):.1f} ms")
                 if st.session_state.is_correct:
                     st.success(f"### 🎉 Parfait !\nJ'ai entendu : **{st.session_state.user_input_val}**")
+                    if st.session_state.verdict == TYPO: st.caption(f"Réponse attendue : **{st.session_state.current_answer}**")
                     if st.session_state.pt_audio: st.audio(st.session_state.pt_audio)
                     st.button("CONTINUER", on_click=next_question, args=(card["id"], not st.session_state.has_failed, "Entraînement (Quiz)"), type="primary", width="stretch")
                 else:
@@ -465,3 +810,6 @@ elif menu in ["Apprentissage (Quizlet)", "Entraînement (Quiz)", "Expression Ora
                     c1, c2 = st.columns(2)
                     c1.button("🔄 RÉESSAYER", on_click=retry_oral, width="stretch")
                     c2.button("CONTINUER ➡️", on_click=next_question, args=(card["id"], False, "Entraînement (Quiz)"), type="primary", width="stretch")
+
+metrics.stop(page_timer)
+metrics.end_rerun(menu, RERUN_START)
@@ -0,0 +1,111 @@
+import csv
+import re
+import sys
+import time
+import unicodedata
+from functools import lru_cache
+
+EXACT, TYPO, WRONG = "exact", "typo", "wrong"
+ARTICLES = {"o", "os", "um", "uma", "uns", "umas", "le", "la", "les", "l", "un", "une"}
+# Articles qui sont aussi des prépositions ("a pé", "às vezes" une fois les accents retirés) :
+# la réponse sans eux n'est acceptée qu'avec un avertissement (TYPO), jamais comme exacte
+AMBIGUOUS_ARTICLES = {"a", "as"}
+ALTERNATIVE_SEPARATORS = re.compile(r"[/,;]")
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+# --- NORMALISATION (MÉMORISÉE) ---
+@lru_cache(maxsize=1 << 18)
+def normalize_text(text):
+    if not text: return ""
+    text = text.lower()
+    text = ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+    text = PUNCTUATION.sub(' ', text)
+    return " ".join(text.split())
+
+def strip_article(norm, articles=ARTICLES):
+    head, _, rest = norm.partition(" ")
+    return rest if rest and head in articles else norm
+
+@lru_cache(maxsize=1 << 18)
+def accepted_forms(expected):
+    # "o carro / a viatura" -> {"o carro / a viatura" normalisé, "o carro", "carro", "a viatura", "viatura"}
+    whole = normalize_text(expected)
+    forms = {whole, strip_article(whole)} if whole else set()
+    for part in ALTERNATIVE_SEPARATORS.split(expected):
+        norm = normalize_text(part)
+        if norm: forms.update((norm, strip_article(norm)))
+    return frozenset(forms)
+
+@lru_cache(maxsize=1 << 18)
+def loose_forms(expected):
+    # "a pé" -> {"pé"} : formes sans article ambigu, tolérées mais pas exactes
+    return frozenset(strip_article(f, AMBIGUOUS_ARTICLES) for f in accepted_forms(expected)) - accepted_forms(expected)
+
+def warm(cards):
+    # Précalcule les formes acceptées de chaque carte (chargement, import)
+    for c in cards:
+        for text in (c["term_target"], c["term_primary"]):
+            accepted_forms(text)
+            loose_forms(text)
+
+# --- DISTANCE D'ÉDITION BORNÉE ---
+def bounded_levenshtein(a, b, max_d):
+    # Renvoie max_d + 1 dès que la distance dépasse forcément max_d
+    if abs(len(a) - len(b)) > max_d: return max_d + 1
+    if len(a) < len(b): a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            cur.append(v)
+            if v < best: best = v
+        if best > max_d: return max_d + 1
+        prev = cur
+    return prev[-1]
+
+def tolerance(form):
+    # Mots courts : aucune faute tolérée ; 1 faute jusqu'à 7 lettres, 2 au-delà
+    n = len(form)
+    return 0 if n <= 3 else 1 if n <= 7 else 2
+
+# --- VERDICT ---
+def grade(answer, expected):
+    given = normalize_text(answer)
+    if not given: return WRONG
+    forms = accepted_forms(expected)
+    candidates = (given, strip_article(given))
+    if any(g in forms for g in candidates): return EXACT
+    if any(g in loose_forms(expected) for g in candidates) or strip_article(given, AMBIGUOUS_ARTICLES) in forms: return TYPO
+    for form in forms:
+        max_d = tolerance(form)
+        if max_d and any(bounded_levenshtein(g, form, max_d) <= max_d for g in candidates): return TYPO
+    return WRONG
+
+def grade_batch(pairs):
+    return [grade(answer, expected) for answer, expected in pairs]
+
+def self_check(cards):
+    # Chaque terme du deck, tapé tel quel, doit être corrigé EXACT ; renvoie les termes en échec
+    return [t for c in cards for t in (c["term_target"], c["term_primary"]) if grade(t, t) != EXACT]
+
+# --- CORRECTION HORS-LIGNE ---
+# python matching.py reponses.csv   (colonnes : réponse, réponse attendue)
+# python matching.py check vocab_db.json   (vérifie que chaque terme est accepté contre lui-même)
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "check":
+        from storage import read_snapshot
+        cards = read_snapshot(sys.argv[2]).get("vocabulary", [])
+        failed = self_check(cards)
+        for t in failed: print(f"refusé : {t}")
+        print(f"{len(cards)} cartes vérifiées, {len(failed)} termes refusés contre eux-mêmes")
+        sys.exit(1 if failed else 0)
+    if len(sys.argv) != 2: sys.exit("Usage : python matching.py REPONSES.csv | python matching.py check BASE")
+    with open(sys.argv[1], newline="", encoding="utf-8") as f:
+        pairs = [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2]
+    start = time.perf_counter()
+    verdicts = grade_batch(pairs)
+    elapsed = time.perf_counter() - start
+    for v in (EXACT, TYPO, WRONG): print(f"{v:>6} : {verdicts.count(v)}")
+    print(f"{len(pairs)} réponses corrigées en {elapsed * 1000:.1f} ms")
@@ -0,0 +1,158 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import wraps
+
+METRICS_PATH = "metrics.json"
+BASE_MS = 0.01
+BUCKETS_PER_OCTAVE = 4  # Résolution de l'histogramme : ~19 % d'écart entre deux seaux
+RECENT_RERUNS = 50
+
+# Désactivé par défaut : timed() et les fonctions décorées ne coûtent alors qu'un test de booléen
+enabled = os.environ.get("LINGO_METRICS", "") not in ("", "0")
+
+_lock = threading.Lock()
+_ops = {}
+_reruns = deque(maxlen=RECENT_RERUNS)
+_local = threading.local()
+
+# --- HISTOGRAMME DE LATENCES ---
+# Seaux logarithmiques : mémoire constante quel que soit le nombre de mesures, percentiles à ~19 % près
+class Histogram:
+    __slots__ = ("count", "total_ms", "max_ms", "bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.bytes = 0
+        self.buckets = {}
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms: self.max_ms = ms
+        i = max(0, math.ceil(math.log2(ms / BASE_MS) * BUCKETS_PER_OCTAVE)) if ms > BASE_MS else 0
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def percentile(self, p):
+        if not self.count: return 0.0
+        target = max(1, math.ceil(p * self.count))
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= target: return min(BASE_MS * 2 ** (i / BUCKETS_PER_OCTAVE), self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {"count": self.count, "p50_ms": round(self.percentile(0.5), 2), "p95_ms": round(self.percentile(0.95), 2), "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0, "max_ms": round(self.max_ms, 2), "bytes": self.bytes}
+
+def _hist(name):
+    h = _ops.get(name)
+    if h is None: h = _ops[name] = Histogram()
+    return h
+
+# --- ENREGISTREMENT ---
+def set_enabled(flag):
+    global enabled
+    enabled = bool(flag)
+
+_configured = False
+
+def configure(flag):
+    # Valeur initiale (secret DIAGNOSTICS) appliquée une fois par processus ; le panneau peut ensuite la changer
+    global _configured
+    if _configured: return
+    _configured = True
+    if flag: set_enabled(True)
+
+def observe(name, ms, nbytes=0):
+    if not enabled: return
+    with _lock:
+        h = _hist(name)
+        h.add(ms)
+        h.bytes += nbytes
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None: rerun[name] = rerun.get(name, 0.0) + ms
+
+def add_bytes(name, nbytes):
+    if not enabled: return
+    with _lock: _hist(name).bytes += nbytes
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self.start) * 1000)
+
+class _NoTimer:
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+
+_NO_TIMER = _NoTimer()
+
+def timed(name):
+    # with metrics.timed("nom"): ...
+    return _Timer(name) if enabled else _NO_TIMER
+
+def instrument(name):
+    # Décorateur : mesure chaque appel de la fonction sous `name`
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled: return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: observe(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
+
+def start(name):
+    # Pour les blocs qu'on ne peut pas entourer d'un with (branches du menu) : jeton à passer à stop()
+    return (name, time.perf_counter()) if enabled else None
+
+def stop(token):
+    if token: observe(token[0], (time.perf_counter() - token[1]) * 1000)
+
+# --- DÉCOMPOSITION PAR RERUN ---
+# Chaque session Streamlit exécute son script dans son propre thread : les mesures faites pendant un
+# rerun sont aussi cumulées dans un dict local au thread, archivé à la fin du rerun.
+def begin_rerun():
+    _local.rerun = {} if enabled else None
+
+def end_rerun(page, started):
+    rerun = getattr(_local, "rerun", None)
+    _local.rerun = None
+    if rerun is None or not enabled: return
+    total = (time.perf_counter() - started) * 1000
+    observe("rerun", total)
+    with _lock: _reruns.append({"time": datetime.now().isoformat(timespec="seconds"), "page": page, "total_ms": round(total, 2), "ops": {k: round(v, 2) for k, v in rerun.items()}})
+
+# --- LECTURE / EXPORT ---
+def snapshot():
+    with _lock:
+        return {"ops": {name: h.summary() for name, h in sorted(_ops.items())}, "reruns": list(_reruns)}
+
+def reset():
+    with _lock:
+        _ops.clear()
+        _reruns.clear()
+
+def export(path=METRICS_PATH):
+    data = snapshot()
+    data["exported"] = datetime.now().isoformat(timespec="seconds")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,91 @@
+import io
+import json
+import sys
+import zipfile
+from datetime import datetime
+from audio_cache import cache_key
+from importer import new_card
+
+PACK_SUFFIX = ".lingopack"
+PACK_FORMAT = 1
+VOICE = ("pt", "pt")  # (lang, tld) utilisés par l'appli pour lire le portugais
+
+class PackError(Exception):
+    pass
+
+# --- PACKS HORS-LIGNE ---
+# Archive zip : pack.json (cartes d'une liste, sans progression) + audio/<clé>.mp3 pour chaque mot.
+# Les clés sont celles du cache audio : une fois le pack importé, aucune synthèse gTTS n'est nécessaire.
+def export_pack(cards, audio, category, progress=None):
+    # audio : AudioCache ; les sons absents du cache sont synthétisés si le réseau le permet, sinon omis
+    futures = audio.prefetch([(c["term_target"], *VOICE) for c in cards])
+    for i, f in enumerate(futures):
+        try: f.result()
+        except: pass
+        if progress: progress((i + 1) / len(futures))
+    buf = io.BytesIO()
+    entries, missing = [], 0
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as z:  # Le mp3 est déjà compressé
+        for c in cards:
+            # Le son est rangé sous la clé du terme nettoyé : c'est celle que calcule import_pack
+            target = c["term_target"].strip()
+            key = cache_key(target, *VOICE)
+            data = audio.cached(c["term_target"], *VOICE)
+            if data: z.writestr(f"audio/{key}.mp3", data)
+            else: missing += 1
+            entries.append({"term_target": target, "term_primary": c["term_primary"].strip(), "audio": key if data else None})
+        manifest = {"format": PACK_FORMAT, "category": category, "created": datetime.now().isoformat(timespec="seconds"), "voice": list(VOICE), "cards": entries}
+        z.writestr("pack.json", json.dumps(manifest, ensure_ascii=False), compress_type=zipfile.ZIP_DEFLATED)
+    return buf.getvalue(), {"cards": len(cards), "audio": len(cards) - missing, "missing_audio": missing}
+
+def read_manifest(z):
+    try: manifest = json.loads(z.read("pack.json"))
+    except (KeyError, ValueError): raise PackError("pack.json absent ou illisible")
+    if not isinstance(manifest, dict): raise PackError("pack.json illisible")
+    if manifest.get("format") != PACK_FORMAT: raise PackError(f"Format de pack non supporté ({manifest.get('format')})")
+    cards = manifest.get("cards")
+    if not isinstance(cards, list) or not all(isinstance(e, dict) and isinstance(e.get("term_target", ""), str) and isinstance(e.get("term_primary", ""), str) for e in cards):
+        raise PackError("Liste de cartes du pack invalide")
+    voice = manifest.get("voice", VOICE)
+    if not isinstance(voice, (list, tuple)) or len(voice) != 2 or not all(isinstance(v, str) for v in voice): raise PackError("Voix du pack invalide")
+    if not isinstance(manifest.get("category") or "", str): raise PackError("Nom de liste du pack invalide")
+    return manifest
+
+def import_pack(file, audio, existing_targets, category=None):
+    # Renvoie (nouvelles cartes, rapport) comme import_vocabulary ; les sons sont rangés dans le cache audio
+    try: z = zipfile.ZipFile(file)
+    except zipfile.BadZipFile: raise PackError("Fichier de pack invalide")
+    with z:
+        manifest = read_manifest(z)
+        category = category or manifest.get("category") or "Général"
+        voice = tuple(manifest.get("voice", VOICE))
+        names = set(z.namelist())
+        seen = set(existing_targets)
+        now = datetime.now().isoformat()
+        new_cards = []
+        report = {"rows": len(manifest["cards"]), "added": 0, "skipped_duplicate": 0, "audio": 0}
+        for entry in manifest["cards"]:
+            target, primary = entry.get("term_target", "").strip(), entry.get("term_primary", "").strip()
+            key = cache_key(target, *voice)
+            # Les sons des mots déjà connus sont aussi importés : ils deviennent disponibles hors-ligne
+            if entry.get("audio") == key and f"audio/{key}.mp3" in names:
+                audio.add(key, z.read(f"audio/{key}.mp3"))
+                report["audio"] += 1
+            if not target or not primary or target in seen:
+                report["skipped_duplicate"] += 1
+                continue
+            seen.add(target)
+            new_cards.append(new_card(target, primary, category, now))
+    report["added"] = len(new_cards)
+    return new_cards, report
+
+# --- INSPECTION ---
+# python packs.py info liste.lingopack
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "info": sys.exit("Usage : python packs.py info PACK.lingopack")
+    with zipfile.ZipFile(sys.argv[2]) as z:
+        manifest = read_manifest(z)
+        audio_bytes = sum(i.file_size for i in z.infolist() if i.filename.startswith("audio/"))
+    with_audio = sum(1 for e in manifest["cards"] if e.get("audio"))
+    print(f"Liste : {manifest.get('category')} ({manifest.get('created')})")
+    print(f"{len(manifest['cards'])} cartes, {with_audio} avec audio ({audio_bytes / 1024:.0f} Ko)")
@@ -0,0 +1,150 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+PROGRESS_PATH = "progress.db"
+DEFAULT_USER = "default"
+FRESH_SRS = ("score", "score_apprentissage", "next_review_date", "next_review_date_apprentissage")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    user TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user, card_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    user TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user, key)
+) WITHOUT ROWID;
+"""
+
+# Fusion atomique côté SQLite : seules les clés envoyées sont remplacées, jamais la ligne entière
+UPSERT = """
+INSERT INTO progress (user, card_id, data) VALUES (?, ?, ?)
+ON CONFLICT (user, card_id) DO UPDATE SET data = json_patch(progress.data, excluded.data)
+"""
+
+# --- PROGRESSION PAR UTILISATEUR ---
+# Le vocabulaire (vocab_db.json) est partagé ; la progression SRS de chaque utilisateur vit ici, une ligne
+# par (utilisateur, carte) : {clé srs: [valeur, horodatage]}, le même format que le delta de synchronisation.
+# Chaque réponse est une transaction SQLite d'une ligne (mode WAL) : aucune réécriture de fichier complet.
+class ProgressStore:
+    def __init__(self, path=PROGRESS_PATH):
+        self.path = path
+        self.local = threading.local()
+        with self._conn() as conn: conn.executescript(SCHEMA)
+
+    def _conn(self):
+        # Une connexion par thread (les sessions Streamlit tournent chacune dans leur thread)
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # --- ÉCRITURE ---
+    def update(self, user, card_id, srs_update, t=None):
+        t = t or datetime.now().isoformat()
+        data = json.dumps({k: [v, t] for k, v in srs_update.items()}, ensure_ascii=False, separators=(",", ":"))
+        self._conn().execute(UPSERT, (user, card_id, data))
+
+    def update_many(self, user, updates, t=None):
+        # updates : {card_id: {clé: valeur}} ; une seule transaction pour tout le lot
+        t = t or datetime.now().isoformat()
+        rows = [(user, card_id, json.dumps({k: [v, t] for k, v in fields.items()}, ensure_ascii=False, separators=(",", ":"))) for card_id, fields in updates.items()]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(UPSERT, rows)
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set_setting(self, user, key, value):
+        self._conn().execute("INSERT INTO settings (user, key, value) VALUES (?, ?, ?) ON CONFLICT (user, key) DO UPDATE SET value = excluded.value", (user, key, json.dumps(value)))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM progress")
+
+    # --- LECTURE ---
+    def load(self, user):
+        return {card_id: json.loads(data) for card_id, data in self._conn().execute("SELECT card_id, data FROM progress WHERE user = ?", (user,))}
+
+    def settings(self, user):
+        return {key: json.loads(value) for key, value in self._conn().execute("SELECT key, value FROM settings WHERE user = ?", (user,))}
+
+    def overlay(self, db, user, newer_than=None):
+        # Applique la progression de l'utilisateur sur une copie de session du deck.
+        # Les nouveaux utilisateurs partent de zéro ; "default" garde la progression historique du fichier.
+        rows = self.load(user)
+        remote = newer_than or {}
+        now = datetime.now().isoformat()
+        for c in db.get("vocabulary", []):
+            srs = c["srs_data"]
+            if user != DEFAULT_USER:
+                for key in list(srs):
+                    if key not in FRESH_SRS: del srs[key]
+                srs.update(score=0, score_apprentissage=0, next_review_date=now, next_review_date_apprentissage=now)
+            row = rows.get(c["id"])
+            if not row: continue
+            card_remote = remote.get(c["id"], {})
+            for key, (value, t) in row.items():
+                if key in card_remote and card_remote[key][1] >= t: continue
+                srs[key] = value
+        db["settings"] = self.settings(user)
+        return db
+
+# --- TEST DE CHARGE ---
+# python progress_store.py stress [sessions] [réponses par session]
+# Des dizaines de sessions simultanées (threads) répondent sur les mêmes cartes ; on vérifie ensuite que
+# chaque réponse a bien été enregistrée (aucune mise à jour perdue).
+def stress(path, sessions=40, answers=250, cards=50):
+    if os.path.exists(path): os.remove(path)
+    store = ProgressStore(path)
+    errors = []
+
+    def session(n):
+        user = f"user{n % 10}"
+        try:
+            for i in range(answers):
+                card_id = f"card{i % cards}"
+                # Chaque session écrit sa propre clé : une écriture perdue laisserait un trou
+                store.update(user, card_id, {f"s{n}": i})
+        except Exception as e:
+            errors.append(e)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+
+    lost = 0
+    for u in range(10):
+        rows = store.load(f"user{u}")
+        for n in range(u, sessions, 10):
+            for i in range(cards):
+                last = max(j for j in range(answers) if j % cards == i)
+                if rows.get(f"card{i}", {}).get(f"s{n}", [None])[0] != last: lost += 1
+    total = sessions * answers
+    print(f"{sessions} sessions, {total} réponses en {elapsed:.2f}s ({total / elapsed:.0f}/s), erreurs : {len(errors)}, mises à jour perdues : {lost}")
+    return not errors and lost == 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "stress":
+        sys.exit("Usage : python progress_store.py stress [SESSIONS] [RÉPONSES]")
+    args = [int(a) for a in sys.argv[2:4]]
+    ok = stress("progress_stress.db", *args)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists("progress_stress.db" + suffix): os.remove("progress_stress.db" + suffix)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,99 @@
+import random
+from collections import deque
+from datetime import datetime
+
+DAY = 86400.0
+DATE_PREFIX = "next_review_date"
+RECENT = 5  # Dernières cartes tirées exclues du tirage : pas de répétition immédiate
+MAX_OVERDUE_DAYS = 30
+
+def card_weight(score, due_ts, now):
+    # Score bas (mot raté) et retard de révision : tiré plus souvent ; un mot maîtrisé garde une petite chance
+    w = 2.0 ** -min(max(score, -3), 5)
+    overdue = min(max(now - due_ts, 0.0) / DAY, MAX_OVERDUE_DAYS)
+    return w * (1 + overdue / 7)
+
+# --- TIRAGE PONDÉRÉ ---
+# Arbre de Fenwick sur les poids : tirage et mise à jour d'un poids en O(log n), construction en O(n)
+# une seule fois par session. Le mode infini ne reparcourt donc plus le vocabulaire à chaque question.
+class CardSampler:
+    def __init__(self, cards, d_key, due_ts, rng=random):
+        self.cards = cards
+        self.s_key = "score" + d_key[len(DATE_PREFIX):]
+        self.rng = rng
+        self.index = {c["id"]: i for i, c in enumerate(cards)}
+        now = datetime.now().timestamp()
+        self.weights = [card_weight(c["srs_data"].get(self.s_key, 0), due_ts.get(c["id"], now), now) for c in cards]
+        self.active = list(self.weights)  # Poids présents dans l'arbre (0 pour les cartes récentes)
+        self.recent = deque()
+        self.window = max(0, min(RECENT, len(cards) - 1))
+        n = len(cards)
+        tree = [0.0] + self.weights
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n: tree[j] += tree[i]
+        self.tree = tree
+        self.total = sum(self.weights)
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self):
+        return len(self.cards)
+
+    def _set(self, i, w):
+        delta = w - self.active[i]
+        if not delta: return
+        self.active[i] = w
+        self.total += delta
+        j = i + 1
+        while j < len(self.tree):
+            self.tree[j] += delta
+            j += j & -j
+
+    def _find(self, u):
+        # Plus petit indice dont la somme cumulée dépasse u
+        pos, step, n = 0, self.top, len(self.cards)
+        while step:
+            nxt = pos + step
+            if nxt <= n and self.tree[nxt] <= u:
+                pos = nxt
+                u -= self.tree[nxt]
+            step >>= 1
+        return min(pos, n - 1)
+
+    def _pick(self):
+        i = self._find(self.rng.random() * self.total)
+        if not self.active[i]:
+            # Arrondi flottant en bout d'arbre : on retombe sur la dernière carte tirable
+            i = max(j for j in range(len(self.cards)) if self.active[j])
+        return i
+
+    def draw(self):
+        if not self.cards: return None
+        i = self._pick()
+        if self.window:
+            self._set(i, 0.0)
+            self.recent.append(i)
+            if len(self.recent) > self.window:
+                j = self.recent.popleft()
+                self._set(j, self.weights[j])
+        return self.cards[i]
+
+    def take(self, k):
+        # k cartes distinctes (série libre), tirées sans remise puis remises dans l'arbre
+        k = min(k, len(self.cards) - len(self.recent))
+        picked = []
+        for _ in range(k):
+            i = self._pick()
+            picked.append(i)
+            self._set(i, 0.0)
+        for i in picked:
+            if i not in self.recent: self._set(i, self.weights[i])
+        return [self.cards[i] for i in picked]
+
+    def update(self, card_id, due_ts, now=None):
+        # À appeler après chaque réponse : seul le poids de la carte révisée change
+        i = self.index.get(card_id)
+        if i is None: return
+        now = now or datetime.now().timestamp()
+        self.weights[i] = card_weight(self.cards[i]["srs_data"].get(self.s_key, 0), due_ts, now)
+        if i not in self.recent: self._set(i, self.weights[i])
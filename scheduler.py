@@ -0,0 +1,155 @@
+from datetime import datetime
+import numpy as np
+from storage import iso_column
+
+DAY = 86400.0
+DATE_PREFIX = "next_review_date"
+LAST_PREFIX = "last_review"
+DEFAULT_EASE = 2.5
+DEFAULT_DIFFICULTY = 5.0
+
+# --- ALGORITHMES ---
+# Tous travaillent sur des colonnes NumPy : review() pour une réponse (tableaux de taille 1) comme pour
+# un lot, intervals() pour recalculer l'intervalle courant à partir de l'état (changement d'algorithme).
+# État : score (+1/-1 par réponse, affiché dans l'appli), interval (jours ; FSRS : stabilité),
+# ease (SM-2), difficulty (FSRS).
+class Ladder:
+    name = "ladder"
+    label = "Paliers (classique)"
+    fields = ()
+    STEPS = np.array([0, 1, 3, 7, 14])
+
+    def intervals(self, st):
+        s = st["score"]
+        return np.where(s <= 0, 0.0, np.where(s < len(self.STEPS), self.STEPS[np.clip(s, 0, len(self.STEPS) - 1)], 30.0)).astype(float)
+
+    def review(self, st, success, elapsed):
+        st["score"] = st["score"] + np.where(success, 1, -1)
+        st["interval"] = self.intervals(st)
+        return st["interval"]
+
+class SM2:
+    name = "sm2"
+    label = "SM-2 (SuperMemo)"
+    fields = ("interval", "ease")
+
+    def intervals(self, st):
+        known = ~np.isnan(st["interval"])
+        n = np.maximum(st["score"], 0)
+        derived = np.where(n == 0, 0.0, np.where(n == 1, 1.0, 6.0 * st["ease"] ** np.maximum(n - 2, 0)))
+        return np.where(known, st["interval"], derived)
+
+    def review(self, st, success, elapsed):
+        # Réponse binaire : réussite = qualité 4 (facilité inchangée), échec = qualité 1
+        interval = np.nan_to_num(st["interval"], nan=0.0)
+        grown = np.where(interval < 1, 1.0, np.where(interval < 6, 6.0, interval * st["ease"]))
+        st["interval"] = np.where(success, grown, 0.0)
+        st["ease"] = np.where(success, st["ease"], np.maximum(1.3, st["ease"] - 0.54))
+        st["score"] = st["score"] + np.where(success, 1, -1)
+        return st["interval"]
+
+class FSRS:
+    # Modèle FSRS simplifié (poids par défaut de FSRS-4.5), rétention visée 90 % : intervalle = stabilité
+    name = "fsrs"
+    label = "FSRS"
+    fields = ("interval", "difficulty")
+    W = (0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474, 0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755)
+
+    def intervals(self, st):
+        known = ~np.isnan(st["interval"])
+        return np.where(known, st["interval"], Ladder().intervals(st))
+
+    def review(self, st, success, elapsed):
+        w = self.W
+        grade = np.where(success, 3, 1)
+        s = np.nan_to_num(st["interval"], nan=0.0)
+        d = st["difficulty"]
+        new = s <= 0
+        r = np.power(1 + np.maximum(elapsed, 0) / (9 * np.maximum(s, 1e-6)), -1.0)
+        s_ok = s * (1 + np.exp(w[8]) * (11 - d) * np.power(np.maximum(s, 1e-6), -w[9]) * (np.exp(w[10] * (1 - r)) - 1))
+        s_fail = w[11] * np.power(d, -w[12]) * (np.power(s + 1, w[13]) - 1) * np.exp(w[14] * (1 - r))
+        s_init = np.where(success, w[2], w[0])
+        st["interval"] = np.where(new, s_init, np.where(success, s_ok, np.minimum(s_fail, s)))
+        st["difficulty"] = np.where(new, w[4] - (grade - 3) * w[5], np.clip(d - w[6] * (grade - 3), 1, 10))
+        st["score"] = st["score"] + np.where(success, 1, -1)
+        return np.where(success, st["interval"], 0.0)
+
+ALGORITHMS = {a.name: a for a in (Ladder(), SM2(), FSRS())}
+DEFAULT_ALGORITHM = "ladder"
+
+# --- CONVERSIONS DE DATES ---
+def to_iso(ts):
+    # Dates naïves en heure locale, comme datetime.now().isoformat() (à la seconde), heure d'été comprise
+    return iso_column(np.asarray(ts, dtype=float))
+
+def _parse(value, default):
+    try: return datetime.fromisoformat(value).timestamp()
+    except: return default
+
+# --- ÉTAT SRS EN COLONNES ---
+# Matérialisé depuis les cartes pour une clé de date (quiz ou apprentissage) ; les opérations en masse
+# (réinitialisation, replanification) se font en une passe NumPy puis sont réécrites dans les cartes.
+class SrsColumns:
+    def __init__(self, cards, d_key, due_ts=None):
+        self.cards = cards
+        self.d_key = d_key
+        self.sfx = d_key[len(DATE_PREFIX):]
+        self.s_key = "score" + self.sfx
+        n = len(cards)
+        now = datetime.now().timestamp()
+        srs = [c["srs_data"] for c in cards]
+        self.score = np.fromiter((s.get(self.s_key, 0) for s in srs), dtype=np.int64, count=n)
+        if due_ts is not None: self.due = np.fromiter((due_ts.get(c["id"], now) for c in cards), dtype=float, count=n)
+        else: self.due = np.fromiter((_parse(s.get(d_key), now) for s in srs), dtype=float, count=n)
+        self.interval = np.fromiter((s.get("interval" + self.sfx, np.nan) for s in srs), dtype=float, count=n)
+        self.ease = np.fromiter((s.get("ease" + self.sfx, DEFAULT_EASE) for s in srs), dtype=float, count=n)
+        self.difficulty = np.fromiter((s.get("difficulty" + self.sfx, DEFAULT_DIFFICULTY) for s in srs), dtype=float, count=n)
+        self.last = np.fromiter((_parse(s.get(LAST_PREFIX + self.sfx), np.nan) for s in srs), dtype=float, count=n)
+
+    def state(self):
+        return {"score": self.score, "interval": self.interval, "ease": self.ease, "difficulty": self.difficulty}
+
+    def reset(self, now=None):
+        self.due[:] = (now or datetime.now()).timestamp()
+        self._write_back(())
+
+    def reschedule(self, previous, algorithm, now=None):
+        # Date de dernière révision (estimée avec l'ancien algorithme si elle n'a pas été enregistrée),
+        # nouvel intervalle avec le nouveau
+        st = self.state()
+        last = np.where(np.isnan(self.last), self.due - previous.intervals(st) * DAY, self.last)
+        interval = algorithm.intervals(st)
+        self.interval = interval
+        self.due = last + interval * DAY
+        self._write_back(algorithm.fields)
+
+    def _write_back(self, fields):
+        dates = to_iso(self.due)
+        columns = {"interval": self.interval, "ease": self.ease, "difficulty": self.difficulty}
+        values = [(f + self.sfx, columns[f].tolist()) for f in fields]
+        for i, (c, date) in enumerate(zip(self.cards, dates)):
+            srs = c["srs_data"]
+            srs[self.d_key] = date
+            for key, col in values: srs[key] = col[i]
+
+# --- RÉVISION D'UNE CARTE ---
+def review_card(algorithm, srs, d_key, success, now=None):
+    # Renvoie les champs srs_data mis à jour (à appliquer et à journaliser)
+    now = now or datetime.now()
+    sfx = d_key[len(DATE_PREFIX):]
+    s_key = "score" + sfx
+    due = _parse(srs.get(d_key), now.timestamp())
+    st = {
+        "score": np.array([srs.get(s_key, 0)]),
+        "interval": np.array([srs.get("interval" + sfx, np.nan)], dtype=float),
+        "ease": np.array([srs.get("ease" + sfx, DEFAULT_EASE)], dtype=float),
+        "difficulty": np.array([srs.get("difficulty" + sfx, DEFAULT_DIFFICULTY)], dtype=float),
+    }
+    # Après un échec la carte est due tout de suite : l'écoulé se mesure depuis la dernière révision
+    # enregistrée, l'estimation échéance - intervalle ne sert que pour les cartes qui n'en ont pas encore
+    last = _parse(srs.get(LAST_PREFIX + sfx), None)
+    if last is None: last = due - np.nan_to_num(st["interval"], nan=0.0)[0] * DAY
+    days = float(algorithm.review(st, np.array([success]), np.array([(now.timestamp() - last) / DAY]))[0])
+    update = {s_key: int(st["score"][0]), d_key: datetime.fromtimestamp(now.timestamp() + days * DAY).isoformat(), LAST_PREFIX + sfx: now.isoformat()}
+    for f in algorithm.fields: update[f + sfx] = round(float(st[f][0]), 4)
+    return update
@@ -0,0 +1,69 @@
+from card_store import DEFAULT_CATEGORY
+from matching import normalize_text
+
+def _keys(text):
+    # Trigrammes du texte normalisé + débuts de mots (1 et 2 lettres) pour les requêtes courtes
+    keys = {text[i:i + 3] for i in range(len(text) - 2)}
+    for word in text.split():
+        keys.add(" " + word[:1])
+        if len(word) >= 2: keys.add(" " + word[:2])
+    return keys
+
+def _query_keys(word):
+    if len(word) >= 3: return {word[i:i + 3] for i in range(len(word) - 2)}
+    return {" " + word}
+
+# --- INDEX DE RECHERCHE ---
+# Recherche insensible aux accents et à la casse sur term_target / term_primary.
+# Mots de 3 lettres et plus : recherche dans le mot (trigrammes) ; 1 ou 2 lettres : début de mot.
+class SearchIndex:
+    def __init__(self, cards):
+        self.cards = []
+        self.texts = []
+        self.postings = {}
+        self.score_min = self.score_max = 0
+        self.add(cards)
+
+    def add(self, cards):
+        for c in cards:
+            pos = len(self.cards)
+            text = normalize_text(c["term_target"]) + " " + normalize_text(c["term_primary"])
+            self.cards.append(c)
+            self.texts.append(" " + text)
+            for key in _keys(text): self.postings.setdefault(key, []).append(pos)
+            score = c["srs_data"].get("score", 0)
+            self.score_min = min(self.score_min, score)
+            self.score_max = max(self.score_max, score)
+
+    def _candidates(self, words):
+        # Intersection des listes de positions, de la plus courte à la plus longue
+        lists = sorted((self.postings.get(k, []) for w in words for k in _query_keys(w)), key=len)
+        if not lists or not lists[0]: return []
+        # Une seule clé (mot de 1 à 3 lettres) : la liste est exacte et déjà triée
+        if len(lists) == 1: return lists[0]
+        result = set(lists[0])
+        for positions in lists[1:]:
+            result.intersection_update(positions)
+            if not result: return []
+        # Les trigrammes ne garantissent pas la sous-chaîne : vérification sur le texte
+        return sorted(p for p in result if all((w if len(w) >= 3 else " " + w) in self.texts[p] for w in words))
+
+    def search(self, query="", categories=None, score_range=None, page=0, per_page=50):
+        # Renvoie (nombre total de résultats, cartes de la page demandée)
+        words = normalize_text(query).split()
+        positions = self._candidates(words) if words else range(len(self.cards))
+        cats = set(categories) if categories is not None else None
+        lo, hi = score_range if score_range else (None, None)
+        if cats is None and lo is None and hi is None:
+            return len(positions), [self.cards[p] for p in positions[page * per_page:(page + 1) * per_page]]
+
+        start, stop = page * per_page, (page + 1) * per_page
+        total, hits = 0, []
+        for p in positions:
+            c = self.cards[p]
+            if cats is not None and c.get("category", DEFAULT_CATEGORY) not in cats: continue
+            score = c["srs_data"].get("score", 0)
+            if (lo is not None and score < lo) or (hi is not None and score > hi): continue
+            if start <= total < stop: hits.append(c)
+            total += 1
+        return total, hits
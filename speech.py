@@ -0,0 +1,106 @@
+import importlib.util
+import io
+import threading
+import time
+import metrics
+from concurrent.futures import ThreadPoolExecutor
+
+UNINTELLIGIBLE = "[Incompréhensible]"
+UNAVAILABLE = "[Service indisponible]"
+DEFAULT_TIMEOUT = 15
+
+# --- MOTEURS DE RECONNAISSANCE ---
+# recognize(recognizer, audio_data) -> texte ; needs_audio = False : pas de décodage (moteur factice)
+class GoogleBackend:
+    name = "google"
+    needs_audio = True
+
+    def __init__(self, language="pt-PT"):
+        self.language = language
+
+    def recognize(self, recognizer, audio_data):
+        return recognizer.recognize_google(audio_data, language=self.language)
+
+class WhisperBackend:
+    # Moteur local (openai-whisper), fonctionne sans réseau une fois le modèle téléchargé
+    name = "local"
+    needs_audio = True
+
+    def __init__(self, model="base", language="portuguese"):
+        # Dépendance optionnelle (absente de requirements.txt) : sans elle, chaque réponse reviendrait
+        # en "[Service indisponible]" sans explication
+        if importlib.util.find_spec("whisper") is None or importlib.util.find_spec("soundfile") is None:
+            raise RuntimeError("SPEECH_BACKEND = \"local\" nécessite openai-whisper : pip install openai-whisper soundfile")
+        self.model = model
+        self.language = language
+
+    def recognize(self, recognizer, audio_data):
+        return recognizer.recognize_whisper(audio_data, model=self.model, language=self.language).strip()
+
+class StubBackend:
+    # Déterministe, pour les tests et benchmarks : renvoie toujours le même texte (ou answer(bytes))
+    name = "stub"
+    needs_audio = False
+
+    def __init__(self, answer="", delay=0.0):
+        self.answer = answer
+        self.delay = delay
+
+    def recognize(self, recognizer, audio_bytes):
+        if self.delay: time.sleep(self.delay)
+        return self.answer(audio_bytes) if callable(self.answer) else self.answer
+
+def make_backend(name):
+    if name == "local": return WhisperBackend()
+    if name == "stub": return StubBackend()
+    return GoogleBackend()
+
+# --- SERVICE ASYNCHRONE ---
+# submit() rend la main tout de suite avec un Future ; le résultat est un dict
+# {"text": ..., "timings": {"decode_ms": ..., "recognize_ms": ...}}.
+class RecognitionService:
+    def __init__(self, backend, workers=2, timeout=DEFAULT_TIMEOUT):
+        self.backend = backend
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speech")
+        self.local = threading.local()
+
+    def _recognizer(self):
+        # Un Recognizer par thread de travail, réutilisé d'un enregistrement à l'autre
+        recognizer = getattr(self.local, "recognizer", None)
+        if recognizer is None:
+            import speech_recognition as sr
+            recognizer = self.local.recognizer = sr.Recognizer()
+            # Sans délai côté réseau, un appel bloqué occuperait un des deux threads partagés indéfiniment
+            recognizer.operation_timeout = self.timeout
+        return recognizer
+
+    def submit(self, audio_bytes):
+        return self.pool.submit(self._run, audio_bytes)
+
+    def _run(self, audio_bytes):
+        timings = {}
+        start = time.perf_counter()
+        if not self.backend.needs_audio:
+            text = self.backend.recognize(None, audio_bytes)
+            timings["decode_ms"] = 0.0
+            timings["recognize_ms"] = (time.perf_counter() - start) * 1000
+            return {"text": text, "timings": timings}
+
+        import speech_recognition as sr
+        recognizer = self._recognizer()
+        try:
+            with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
+                audio_data = recognizer.record(source)
+        except Exception:
+            timings["decode_ms"] = (time.perf_counter() - start) * 1000
+            return {"text": UNINTELLIGIBLE, "timings": timings}
+        decoded = time.perf_counter()
+        timings["decode_ms"] = (decoded - start) * 1000
+        try: text = self.backend.recognize(recognizer, audio_data)
+        except sr.UnknownValueError: text = UNINTELLIGIBLE
+        except Exception: text = UNAVAILABLE
+        timings["recognize_ms"] = (time.perf_counter() - decoded) * 1000
+        metrics.observe("speech.decode", timings["decode_ms"], len(audio_bytes))
+        metrics.observe("speech.recognize", timings["recognize_ms"])
+        return {"text": text, "timings": timings}
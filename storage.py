@@ -0,0 +1,188 @@
+import gc
+import gzip
+import json
+import os
+import sys
+import threading
+import metrics
+from contextlib import contextmanager
+from datetime import datetime
+try: import fcntl
+except ImportError: fcntl = None  # Windows : seul le verrou entre threads s'applique
+
+JOURNAL_SUFFIX = ".journal"
+COMPACT_SUFFIX = ".lingo"  # Format colonnaire compressé (voir plus bas)
+COLUMNAR_VERSION = 1
+
+CARD_KEYS = ("id", "category", "term_target", "term_primary", "srs_data")
+SCORE_KEYS = ("score", "score_apprentissage")
+DATE_KEYS = ("next_review_date", "next_review_date_apprentissage")
+
+# --- FORMAT COLONNAIRE COMPACT ---
+# Une colonne par champ au lieu d'un objet par carte : catégories internées (index entiers),
+# scores entiers, dates en secondes epoch, le tout compressé en gzip.
+# Les champs inattendus (autres clés de carte ou de srs_data) sont conservés dans "extra".
+def _to_epoch(value):
+    try: return int(datetime.fromisoformat(value).timestamp())
+    except: return None
+
+def to_columns(db):
+    cards = db.get("vocabulary", [])
+    categories = {}
+    cols = {"id": [], "category": [], "term_target": [], "term_primary": []}
+    for k in SCORE_KEYS + DATE_KEYS: cols[k] = []
+    extra = {}
+    for i, c in enumerate(cards):
+        srs = c.get("srs_data", {})
+        cols["id"].append(c["id"])
+        cols["category"].append(categories.setdefault(c.get("category", "Général"), len(categories)))
+        cols["term_target"].append(c["term_target"])
+        cols["term_primary"].append(c["term_primary"])
+        for k in SCORE_KEYS: cols[k].append(srs.get(k, 0))
+        for k in DATE_KEYS: cols[k].append(_to_epoch(srs.get(k)))
+        card_extra = {k: v for k, v in c.items() if k not in CARD_KEYS}
+        srs_extra = {k: v for k, v in srs.items() if k not in SCORE_KEYS + DATE_KEYS}
+        if srs_extra: card_extra["srs_data"] = srs_extra
+        if card_extra: extra[str(i)] = card_extra
+    return {
+        "format": "lingo-columnar", "version": COLUMNAR_VERSION,
+        "meta": {k: v for k, v in db.items() if k != "vocabulary"},
+        "categories": list(categories), "columns": cols, "extra": extra,
+    }
+
+def iso_column(values):
+    # Conversion epoch -> ISO local en une passe NumPy ; le décalage (heure d'été) est calculé une fois par heure distincte.
+    # values : liste (None = maintenant) ou tableau NumPy de timestamps
+    import numpy as np
+    now = int(datetime.now().timestamp())
+    ts = values.astype(np.int64) if isinstance(values, np.ndarray) else np.array([now if v is None else v for v in values], dtype=np.int64)
+    hours, inverse = np.unique(ts // 3600, return_inverse=True)
+    offsets = np.array([datetime.fromtimestamp(int(h) * 3600).astimezone().utcoffset().total_seconds() for h in hours], dtype=np.int64)
+    return np.datetime_as_string((ts + offsets[inverse.reshape(-1)]).astype("datetime64[s]")).tolist()
+
+def from_columns(data):
+    cols = data["columns"]
+    categories = data["categories"]
+    dates = iso_column(cols["next_review_date"]), iso_column(cols["next_review_date_apprentissage"])
+    # Construction en masse de petits dicts : le GC est suspendu, comme pour session_copy
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        cards = [
+            {"id": card_id, "category": categories[cat], "term_target": target, "term_primary": primary,
+             "srs_data": {"score": s, "score_apprentissage": s_app, "next_review_date": d, "next_review_date_apprentissage": d_app}}
+            for card_id, cat, target, primary, s, s_app, d, d_app in zip(
+                cols["id"], cols["category"], cols["term_target"], cols["term_primary"],
+                cols["score"], cols["score_apprentissage"], *dates)
+        ]
+        for i, card_extra in data.get("extra", {}).items():
+            card = cards[int(i)]
+            card["srs_data"].update(card_extra.get("srs_data", {}))
+            card.update({k: v for k, v in card_extra.items() if k != "srs_data"})
+    finally:
+        if enabled: gc.enable()
+    db = dict(data.get("meta", {}))
+    db["vocabulary"] = cards
+    return db
+
+# --- SNAPSHOT (ÉCRITURE ATOMIQUE) ---
+def is_compact(path):
+    return path.endswith(COMPACT_SUFFIX)
+
+def resolve_db_path(json_path):
+    # Le format compact est utilisé dès qu'il existe sur disque, sinon le JSON historique
+    compact = os.path.splitext(json_path)[0] + COMPACT_SUFFIX
+    return compact if os.path.exists(compact) else json_path
+
+def read_snapshot(path):
+    if is_compact(path):
+        with gzip.open(path, "rb") as f:  # json décode lui-même l'UTF-8, plus vite qu'un flux texte
+            return from_columns(json.load(f))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@metrics.instrument("snapshot.write")
+def write_snapshot(db, path):
+    # On écrit dans un fichier temporaire puis on le renomme : un crash ne peut plus tronquer la base
+    tmp = path + ".tmp"
+    if is_compact(path):
+        with open(tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as f:
+                f.write(json.dumps(to_columns(db), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(db, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+    metrics.add_bytes("snapshot.write", os.path.getsize(tmp))
+    os.replace(tmp, path)
+
+# --- MISE À JOUR CONCURRENTE DU VOCABULAIRE ---
+# Plusieurs sessions (voire plusieurs processus) peuvent importer en même temps : on relit la base sous
+# verrou, on applique la modification, on réécrit. Aucune session n'écrase donc l'import d'une autre.
+_thread_lock = threading.Lock()
+
+@contextmanager
+def file_lock(path):
+    with _thread_lock, open(path + ".lock", "a") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+
+def update_snapshot(path, apply):
+    with file_lock(path):
+        db = read_snapshot(path) if os.path.exists(path) else {"vocabulary": []}
+        apply(db)
+        write_snapshot(db, path)
+    return db
+
+# --- MIGRATION ENTRE FORMATS ---
+# python storage.py migrate vocab_db.json vocab_db.lingo   (et inversement)
+# L'ancien fichier est renommé en .bak pour que resolve_db_path choisisse le nouveau.
+def migrate(src, dst):
+    db = read_snapshot(src)
+    write_snapshot(db, dst)
+    os.replace(src, src + ".bak")
+    return len(db.get("vocabulary", []))
+
+# --- ANCIEN JOURNAL DES RÉVISIONS (LECTURE SEULE) ---
+# Avant la base de progression, chaque réponse ajoutait une ligne {"id": ..., "srs": {clé: valeur}, "t": ...}
+# à <base>.journal. bootstrap.load_deck rejoue une dernière fois ce fichier dans le snapshot puis le vide.
+class ReviewJournal:
+    def __init__(self, db_path):
+        self.path = db_path + JOURNAL_SUFFIX
+        self.pending = self._count_lines()
+
+    def _count_lines(self):
+        if not os.path.exists(self.path): return 0
+        with open(self.path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def replay(self, db):
+        # Les valeurs sont absolues (nouveau score, nouvelle date) : rejouer deux fois une ligne est sans effet
+        if not os.path.exists(self.path): return 0
+        cards = {c["id"]: c for c in db.get("vocabulary", [])}
+        applied = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try: rec = json.loads(line)
+                except ValueError: continue  # Dernière ligne incomplète après un crash
+                card = cards.get(rec.get("id"))
+                if card is None: continue
+                card["srs_data"].update(rec.get("srs", {}))
+                applied += 1
+        return applied
+
+    def clear(self):
+        with open(self.path, "w", encoding="utf-8"): pass
+        self.pending = 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "migrate":
+        sys.exit("Usage : python storage.py migrate SOURCE DESTINATION  (.json <-> .lingo)")
+    n = migrate(sys.argv[2], sys.argv[3])
+    print(f"{n} cartes migrées : {sys.argv[2]} -> {sys.argv[3]} ({os.path.getsize(sys.argv[3])} octets)")